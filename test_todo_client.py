@@ -0,0 +1,58 @@
+"""Tests for classifying `?since=` answers (todo_client.parse_task_changes).
+
+python -m pytest -q test_todo_client.py
+"""
+
+import pytest
+
+import todo_client
+from todo_standin_server import StandInServer
+from todo_store import TaskStore
+
+
+def test_delta_with_sync_mark():
+    changes = todo_client.parse_task_changes(
+        {
+            "tasks": [{"taskId": "a", "title": "A"}, {"taskId": "b", "deleted": True}],
+            "deletedTaskIds": ["c"],
+            "syncMark": 7,
+        }
+    )
+    assert [t["taskId"] for t in changes.tasks] == ["a"]
+    assert changes.deleted_ids == ["c", "b"]
+    assert changes.sync_mark == 7
+
+
+def test_empty_delta_with_sync_mark_changes_nothing():
+    store = TaskStore()
+    store.replace_all([{"taskId": "a"}, {"taskId": "b"}], endpoint="e")
+    changes = todo_client.parse_task_changes({"tasks": [], "syncMark": 3})
+    store.apply_delta(changes.tasks, changes.deleted_ids, changes.sync_mark)
+    assert [t["taskId"] for t in store.tasks()] == ["a", "b"]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"tasks": []},  # "Nothing changed", or an empty full listing
+        {"tasks": [{"taskId": "a", "deleted": True}]},  # Tombstones only
+        {"tasks": [{"taskId": "a"}], "deletedTaskIds": ["b"]},
+        {"tasks": [{"taskId": "a"}, {"taskId": "b"}]},  # `since` ignored
+        {"tasks": [], "syncMark": None},
+        [],
+    ],
+)
+def test_answer_without_sync_mark_is_not_trusted(body):
+    assert todo_client.parse_task_changes(body) is None
+
+
+def test_fetch_task_changes_from_standin():
+    with StandInServer(task_count=3) as server:
+        session = todo_client.create_session()
+        mark = server.backend.version
+        assert todo_client.fetch_task_changes(session, server.url, mark).tasks == []
+        task = server.backend.list({})["tasks"][0]
+        server.backend.delete(task["taskId"])
+        changes = todo_client.fetch_task_changes(session, server.url, mark)
+        assert changes.deleted_ids == [task["taskId"]]
+        assert changes.sync_mark == server.backend.version
@@ -0,0 +1,106 @@
+"""Tests for the write-behind queue, alone and driven through the app.
+
+python -m pytest -q test_todo_writebehind.py
+"""
+
+import logging
+import os
+import time
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import todo_client
+from todo_standin_server import StandInServer
+from todo_writebehind import WriteBehindQueue
+
+APP_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "todo_streamlit_app.py"
+)
+
+
+@pytest.fixture
+def server():
+    with StandInServer(task_count=5) as server:
+        yield server
+
+
+def _first_task(server, completed=False):
+    tasks = server.backend.list({})["tasks"]
+    return next(t for t in tasks if t["completed"] == completed)
+
+
+def _backend_task(server, task_id):
+    return next(t for t in server.backend.list({})["tasks"] if t["taskId"] == task_id)
+
+
+def _row_checkbox(at, task_id):
+    # The row is in either section, depending on whether the pages reloaded
+    return next(c for c in at.checkbox if c.key and c.key.endswith(f"_{task_id}_check"))
+
+
+def test_repeated_changes_flush_within_one_delay(server):
+    task = _first_task(server)
+    queue = WriteBehindQueue(todo_client.create_session(), server.url, flush_delay=0.2)
+    # Changes arriving faster than flush_delay must not postpone the write
+    deadline = time.monotonic() + 1.0
+    while time.monotonic() < deadline and not server.counts["PUT"]:
+        queue.update(task["taskId"], {"title": f"Edit {time.monotonic()}"})
+        time.sleep(0.02)
+    assert server.counts["PUT"] >= 1
+    assert queue.wait_idle(timeout=5)
+
+
+def test_toggle_back_sends_nothing(server):
+    task = _first_task(server)
+    queue = WriteBehindQueue(todo_client.create_session(), server.url)
+    queue.update(task["taskId"], {"completed": True}, snapshot=task)
+    queue.update(task["taskId"], {"completed": False}, snapshot=task)
+    assert queue.wait_idle(timeout=5)
+    assert server.counts["PUT"] == 0 and server.counts["POST"] == 0
+
+
+@pytest.mark.parametrize("write_behind", [True, False])
+def test_check_row_with_server_paging(server, monkeypatch, write_behind):
+    # The paged rows are not in the TaskStore; ticking one used to rerun
+    # the row forever
+    logging.disable(logging.WARNING)
+    monkeypatch.setenv("TODO_API_URL", server.url)
+    at = AppTest.from_file(APP_PATH, default_timeout=10)
+    at.session_state["server_side_paging"] = True
+    at.session_state["write_behind"] = write_behind
+    at.run()
+    task_id = _first_task(server)["taskId"]
+
+    _row_checkbox(at, task_id).check().run()
+    assert not at.exception
+    assert _row_checkbox(at, task_id).value is True
+    if write_behind:
+        assert at.session_state["write_queue"].wait_idle(timeout=5)
+    assert _backend_task(server, task_id)["completed"] is True
+
+    _row_checkbox(at, task_id).uncheck().run()
+    assert not at.exception
+    assert _row_checkbox(at, task_id).value is False
+    if write_behind:
+        assert at.session_state["write_queue"].wait_idle(timeout=5)
+    assert _backend_task(server, task_id)["completed"] is False
+
+
+def test_failed_background_write_is_shown(server, monkeypatch):
+    logging.disable(logging.WARNING)
+    monkeypatch.setenv("TODO_API_URL", server.url)
+    at = AppTest.from_file(APP_PATH, default_timeout=10)
+    at.session_state["write_behind"] = True
+    at.run()
+    # Polled from the first run on, before anything was queued
+    assert "write_queue" in at.session_state
+    task_id = _first_task(server)["taskId"]
+    server.backend.delete(task_id)  # The PUT will get a 404
+
+    _row_checkbox(at, task_id).check().run()
+    assert at.session_state["write_queue_busy"]
+    assert at.session_state["write_queue"].wait_idle(timeout=5)
+    at.run()  # What the poller's rerun does
+    assert any("failed" in e.value for e in at.sidebar.error)
+    assert not at.session_state["write_queue_busy"]
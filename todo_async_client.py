@@ -0,0 +1,296 @@
+"""Asyncio client for the to-do backend, driven from the (sync) script thread.
+
+Same contract as the helpers in todo_client: `list_tasks` returns the
+`tasks` list, `create_task` / `update_task` the `task` object, `delete_task`
+the `message`. Failures are raised as requests exceptions (carrying the
+response), so todo_client.describe_error / extract_error_detail and the UI's
+`except requests.exceptions.RequestException` handlers work unchanged.
+
+Requests go through one httpx.AsyncClient (a keep-alive connection pool) on
+an event loop that runs on a daemon thread. The script thread hands it a
+group of coroutines with AsyncRunner.run(); they run concurrently, so a group
+costs about its slowest request instead of the sum. A group is cancelled,
+and Superseded raised in the waiting thread, when
+
+- a newer group is started under the same `key` (e.g. the same section of
+  the same browser session), or
+- `should_cancel()` turns true while waiting (the app passes a check for
+  "a newer rerun has been requested").
+
+httpx is optional (requirements-optional.txt); without it `available()` is False
+and the app keeps using todo_client.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+import todo_bulk
+import todo_client
+import todo_instrumentation
+
+try:
+    import httpx
+except ImportError:  # Optional dependency
+    httpx = None
+
+# Seconds between should_cancel() checks while the script thread waits.
+CANCEL_POLL_INTERVAL = 0.05
+
+# Concurrent requests for one group of mutations (like todo_bulk.MAX_WORKERS).
+MAX_CONCURRENCY = todo_bulk.MAX_WORKERS
+
+# Clients (connection pools) an AsyncRunner keeps before the least recently
+# used one is closed; one per backend URL the app's users have pointed it at.
+MAX_CLIENTS = 8
+
+
+def available():
+    return httpx is not None
+
+
+class Superseded(Exception):
+    """The group of requests was cancelled in favour of a newer one."""
+
+
+def _as_requests_error(exc):
+    """Maps an httpx exception onto the matching requests exception."""
+    message = str(exc) or type(exc).__name__
+    if isinstance(exc, httpx.TimeoutException):
+        error = requests.exceptions.Timeout(message)
+    elif isinstance(exc, httpx.TransportError):
+        error = requests.exceptions.ConnectionError(message)
+    else:
+        error = requests.exceptions.RequestException(message)
+    return error
+
+
+class AsyncTaskClient:
+    """The four task helpers plus page fetching, as coroutines."""
+
+    def __init__(
+        self,
+        endpoint,
+        max_connections=todo_client.POOL_MAXSIZE,
+        timeout=todo_client.DEFAULT_TIMEOUT,
+    ):
+        if httpx is None:
+            raise ImportError("todo_async_client needs httpx (pip install httpx)")
+        self.endpoint = endpoint
+        connect_timeout, read_timeout = timeout
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            headers={
+                "Accept": todo_client.JSON_TYPE,
+                "Accept-Encoding": todo_client.ACCEPT_ENCODING,
+            },
+        )
+        self._active = 0  # Requests in flight (only touched on the loop)
+        self._retired = False
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    def retire(self):
+        """Closes the client once its requests in flight are done (on the loop)."""
+        self._retired = True
+        if not self._active:
+            asyncio.get_running_loop().create_task(self.aclose())
+
+    async def request(self, method, url, **kwargs):
+        """Sends one request; raises requests exceptions for failures.
+
+        Recorded by the active todo_instrumentation collector, if any.
+        """
+        collector = todo_instrumentation.current()
+        status, nbytes, response = None, 0, None
+        started = time.perf_counter()
+        self._active += 1
+        try:
+            try:
+                response = await self._http.request(method, url, **kwargs)
+            except httpx.HTTPError as e:
+                raise _as_requests_error(e) from e
+            status = response.status_code
+            # Bytes on the wire: Content-Length is the compressed size
+            nbytes = int(
+                response.headers.get("Content-Length") or len(response.content)
+            )
+            if response.is_error:
+                kind = "Client" if status < 500 else "Server"
+                raise requests.exceptions.HTTPError(
+                    f"{status} {kind} Error: {response.reason_phrase} for url: {url}",
+                    response=response,
+                )
+            return response
+        finally:
+            self._active -= 1
+            if self._retired and not self._active:
+                asyncio.get_running_loop().create_task(self.aclose())
+            if collector is not None:
+                collector.record_request(
+                    method,
+                    todo_instrumentation.url_template(url, kwargs.get("params")),
+                    status,
+                    nbytes,
+                    time.perf_counter() - started,
+                )
+
+    # --- The todo_client helpers ---
+    async def list_tasks(self):
+        response = await self.request(
+            "GET", self.endpoint, headers=todo_client.task_list_headers()
+        )
+        return todo_client.decode_body(response).get("tasks", [])
+
+    async def fetch_task_page(self, params):
+        """One page of tasks: (tasks, next_cursor or None)."""
+        response = await self.request(
+            "GET", self.endpoint, params=params, headers=todo_client.task_list_headers()
+        )
+        body = todo_client.decode_body(response)
+        return body.get("tasks", []), body.get("nextCursor")
+
+    async def create_task(self, title, due_date):
+        response = await self.request(
+            "POST", self.endpoint, json={"title": title, "dueDate": due_date}
+        )
+        return response.json().get("task", {})
+
+    async def update_task(self, task_id, changes):
+        response = await self.request("PUT", f"{self.endpoint}/{task_id}", json=changes)
+        return response.json().get("task", {})
+
+    async def delete_task(self, task_id):
+        response = await self.request("DELETE", f"{self.endpoint}/{task_id}")
+        return response.json().get("message", f"Task '{task_id}' deleted successfully!")
+
+    # --- Composites ---
+    async def ensure_cursor(self, cursor, count):
+        """Async TaskCursor.ensure(): its pages are still fetched in order."""
+        while cursor.needs(count):
+            cursor.add_page(*await self.fetch_task_page(cursor.next_params()))
+        return cursor.tasks
+
+    async def run_bulk(self, operations, max_concurrency=MAX_CONCURRENCY):
+        """todo_bulk.run_bulk() over single-task calls, as one coroutine."""
+        result = todo_bulk.BulkResult()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(op):
+            async with semaphore:
+                if op["op"] == "create":
+                    return await self.create_task(op["title"], op["dueDate"])
+                if op["op"] == "delete":
+                    await self.delete_task(op["taskId"])
+                    return None
+                return await self.update_task(op["taskId"], op["changes"])
+
+        outcomes = await asyncio.gather(
+            *(run_one(op) for op in operations), return_exceptions=True
+        )
+        # In submission order, like todo_bulk
+        for op, outcome in zip(operations, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            if isinstance(outcome, Exception):
+                result.failed.append((op, todo_client.describe_error(outcome)))
+                if todo_client.is_retryable(outcome):
+                    result.retryable.append(op)
+            else:
+                result.succeeded.append((op, outcome))
+        return result
+
+
+class AsyncRunner:
+    """An event loop on a daemon thread, plus one AsyncTaskClient per endpoint.
+
+    Meant to be shared by the whole process (the app keeps it in
+    st.cache_resource); run() may be called from any number of threads.
+    Endpoints come from user input, so at most `max_clients` clients are
+    kept; the least recently used one is retired when another is needed.
+    """
+
+    def __init__(
+        self, max_connections=todo_client.POOL_MAXSIZE, max_clients=MAX_CLIENTS
+    ):
+        self.max_connections = max_connections
+        self.max_clients = max_clients
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="todo-async-client", daemon=True
+        )
+        self._thread.start()
+        self._clients = OrderedDict()
+        self._in_flight = {}  # key -> concurrent.futures.Future of its group
+        self._lock = threading.Lock()
+
+    def client(self, endpoint):
+        with self._lock:
+            client = self._clients.get(endpoint)
+            if client is None:
+                client = self._clients[endpoint] = AsyncTaskClient(
+                    endpoint, max_connections=self.max_connections
+                )
+            self._clients.move_to_end(endpoint)
+            while len(self._clients) > self.max_clients:
+                _, evicted = self._clients.popitem(last=False)
+                self.loop.call_soon_threadsafe(evicted.retire)
+            return client
+
+    def run(self, *coroutines, key=None, should_cancel=None, return_exceptions=False):
+        """Runs `coroutines` concurrently and returns their results, in order.
+
+        Blocks the calling thread; raises Superseded if the group is cancelled
+        (see the module docstring). With `return_exceptions`, failures are
+        returned in place of results instead of raised.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            _gather(coroutines, todo_instrumentation.current(), return_exceptions),
+            self.loop,
+        )
+        if key is not None:
+            with self._lock:
+                previous = self._in_flight.get(key)
+                self._in_flight[key] = future
+            if previous is not None:
+                previous.cancel()  # Cancels its requests on the loop
+        try:
+            while True:
+                try:
+                    return future.result(timeout=CANCEL_POLL_INTERVAL)
+                except concurrent.futures.TimeoutError:
+                    if should_cancel is not None and should_cancel():
+                        future.cancel()
+                        raise Superseded()
+        except concurrent.futures.CancelledError:
+            raise Superseded() from None
+        finally:
+            if key is not None:
+                with self._lock:
+                    if self._in_flight.get(key) is future:
+                        del self._in_flight[key]
+
+    def close(self):
+        async def close_clients():
+            for client in self._clients.values():
+                await client.aclose()
+
+        asyncio.run_coroutine_threadsafe(close_clients(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+async def _gather(coroutines, collector, return_exceptions):
+    # Runs in a task of its own, so this only affects the group's requests:
+    # the waiting thread's collector (if any) records them.
+    todo_instrumentation.activate(collector)
+    return await asyncio.gather(*coroutines, return_exceptions=return_exceptions)
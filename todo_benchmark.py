@@ -0,0 +1,143 @@
+"""Rerun-latency benchmark of the Streamlit app against the local stand-in.
+
+Runs todo_streamlit_app.py headless with Streamlit's AppTest, pointed at an
+in-process todo_standin_server, for growing task counts, and reports for each:
+
+- cold run: first script run (fetch + render)
+- warm reruns: plain reruns with no interaction (median / p95)
+- toggle: the rerun after completing one task
+- requests made to the backend in each phase
+- peak Python memory of a cold run (tracemalloc; includes the stand-in)
+
+    python todo_benchmark.py
+    python todo_benchmark.py --sizes 100 1000 --reruns 20 --latency 0.02
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import time
+import tracemalloc
+
+from streamlit.testing.v1 import AppTest
+
+from todo_instrumentation import percentile
+from todo_standin_server import StandInServer
+
+APP_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "todo_streamlit_app.py"
+)
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+
+def _new_app(page_size, timeout):
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    if page_size:
+        at.session_state["page_size"] = page_size
+    return at
+
+
+def _timed_run(at):
+    started = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - started
+    if at.exception:
+        raise RuntimeError(f"App raised: {at.exception[0].message}")
+    return elapsed
+
+
+def benchmark_size(task_count, reruns=10, latency=0.0, page_size=None, timeout=120):
+    """Benchmarks one dataset size; returns a dict of results."""
+    with StandInServer(task_count=task_count, latency=latency) as server:
+        os.environ["TODO_API_URL"] = server.url
+        result = {"tasks": task_count}
+
+        at = _new_app(page_size, timeout)
+        before = server.request_count
+        result["cold_ms"] = _timed_run(at) * 1000
+        result["cold_requests"] = server.request_count - before
+
+        before = server.request_count
+        warm = [_timed_run(at) for _ in range(reruns)]
+        result["warm_median_ms"] = statistics.median(warm) * 1000
+        result["warm_p95_ms"] = percentile(warm, 95) * 1000
+        result["warm_requests"] = server.request_count - before
+
+        pending = [c for c in at.checkbox if c.key and c.key.startswith("pending_")]
+        if pending:
+            pending[0].check()
+            before = server.request_count
+            result["toggle_ms"] = _timed_run(at) * 1000
+            result["toggle_requests"] = server.request_count - before
+
+        # Separate pass: tracemalloc slows everything down, so no timings here
+        tracemalloc.start()
+        try:
+            _timed_run(_new_app(page_size, timeout))
+            result["peak_mib"] = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def format_table(results):
+    columns = [
+        ("tasks", "tasks", "{}"),
+        ("cold_ms", "cold ms", "{:.0f}"),
+        ("cold_requests", "cold req", "{}"),
+        ("warm_median_ms", "warm p50 ms", "{:.0f}"),
+        ("warm_p95_ms", "warm p95 ms", "{:.0f}"),
+        ("warm_requests", "warm req", "{}"),
+        ("toggle_ms", "toggle ms", "{:.0f}"),
+        ("toggle_requests", "toggle req", "{}"),
+        ("peak_mib", "peak MiB", "{:.1f}"),
+    ]
+    rows = [[title for _, title, _ in columns]]
+    for result in results:
+        rows.append(
+            [
+                fmt.format(result[key]) if key in result else "-"
+                for key, _, fmt in columns
+            ]
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return "\n".join(
+        "  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the to-do app reruns.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--reruns", type=int, default=10, help="Warm reruns per size")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Stand-in latency per request (s)"
+    )
+    parser.add_argument("--page-size", type=int, help="Tasks per page in the app")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    # Streamlit logs a warning per unlabeled widget; not useful here
+    logging.disable(logging.WARNING)
+
+    results = []
+    for size in args.sizes:
+        results.append(
+            benchmark_size(
+                size,
+                reruns=args.reruns,
+                latency=args.latency,
+                page_size=args.page_size,
+            )
+        )
+        print(f"... {size} tasks done", flush=True)
+    print(format_table(results))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
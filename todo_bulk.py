@@ -0,0 +1,158 @@
+"""Applying one action (complete, delete, reschedule, ...) to many tasks.
+
+Operations use the same shape as the backend batch endpoint (see
+todo_client.batch_tasks). When the backend has no batch endpoint, the single
+task calls are fanned out over a small thread pool instead.
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import todo_client
+
+# Upper bound on concurrent requests for one bulk action, so a large selection
+# doesn't flood API Gateway (or the session's connection pool).
+MAX_WORKERS = 8
+
+# Operations per batch request (DynamoDB's BatchWriteItem also caps at 25).
+BATCH_CHUNK_SIZE = 25
+
+
+def create_op(title, due_date):
+    return {"op": "create", "title": title, "dueDate": due_date}
+
+
+def update_op(task_id, changes):
+    return {"op": "update", "taskId": task_id, "changes": changes}
+
+
+def delete_op(task_id):
+    return {"op": "delete", "taskId": task_id}
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart, across threads.
+
+    Each caller reserves the next free slot under the lock and then sleeps
+    until it outside the lock, so waiting callers don't block each other.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_at)
+            self._next_at = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class BulkResult:
+    """Outcome of a bulk action.
+
+    `succeeded` holds (operation, task) pairs, where task is the object the
+    backend returned (None for deletes, the new task for creates). `failed` holds (operation, message).
+    `retryable` lists the failed operations whose error was transient (no
+    response, throttling, 5xx) rather than a rejection of the operation.
+    """
+
+    __slots__ = ("succeeded", "failed", "retryable")
+
+    def __init__(self):
+        self.succeeded = []
+        self.failed = []
+        self.retryable = []
+
+
+def run_bulk(
+    session,
+    endpoint,
+    operations,
+    use_batch=False,
+    max_workers=MAX_WORKERS,
+    rate_limit=None,
+):
+    """Runs `operations`; `rate_limit` caps the requests sent per second."""
+    result = BulkResult()
+    if not operations:
+        return result
+    limiter = RateLimiter(rate_limit) if rate_limit else None
+    if use_batch:
+        _run_batched(session, endpoint, operations, result, limiter)
+    else:
+        _run_fanned_out(session, endpoint, operations, result, max_workers, limiter)
+    return result
+
+
+def _run_one(session, endpoint, op, limiter=None):
+    if limiter is not None:
+        limiter.wait()
+    if op["op"] == "create":
+        return todo_client.create_task(session, endpoint, op["title"], op["dueDate"])
+    if op["op"] == "delete":
+        todo_client.delete_task(session, endpoint, op["taskId"])
+        return None
+    return todo_client.update_task(session, endpoint, op["taskId"], op["changes"])
+
+
+def _run_fanned_out(session, endpoint, operations, result, max_workers, limiter):
+    workers = max(1, min(max_workers, len(operations)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Each call runs in a copy of the caller's context, so instrumentation
+        # active in the script thread also sees the worker threads' requests
+        futures = [
+            (
+                op,
+                pool.submit(
+                    contextvars.copy_context().run,
+                    _run_one,
+                    session,
+                    endpoint,
+                    op,
+                    limiter,
+                ),
+            )
+            for op in operations
+        ]
+        # Collected in submission order so the report follows the selection
+        for op, future in futures:
+            try:
+                result.succeeded.append((op, future.result()))
+            except Exception as e:
+                result.failed.append((op, todo_client.describe_error(e)))
+                if todo_client.is_retryable(e):
+                    result.retryable.append(op)
+
+
+def _run_batched(session, endpoint, operations, result, limiter):
+    for start in range(0, len(operations), BATCH_CHUNK_SIZE):
+        chunk = operations[start : start + BATCH_CHUNK_SIZE]
+        if limiter is not None:
+            limiter.wait()
+        try:
+            results = todo_client.batch_tasks(session, endpoint, chunk)
+        except Exception as e:
+            message = todo_client.describe_error(e)
+            result.failed.extend((op, message) for op in chunk)
+            if todo_client.is_retryable(e):
+                result.retryable.extend(chunk)
+            continue
+        by_id = {r.get("taskId"): r for r in results}
+        for i, op in enumerate(chunk):
+            if op["op"] == "create":
+                # New tasks have no id to match on; results are in order
+                item = results[i] if i < len(results) else None
+            else:
+                item = by_id.get(op["taskId"])
+            if item is None:
+                result.failed.append((op, "No result returned by batch endpoint."))
+            elif item.get("ok", True) and not item.get("error"):
+                result.succeeded.append((op, item.get("task")))
+            else:
+                result.failed.append((op, item.get("error", "Unknown error.")))
@@ -0,0 +1,623 @@
+"""HTTP plumbing for talking to the Chalice to-do backend.
+
+Kept free of Streamlit calls so the same client can be reused by scripts that
+run outside of `streamlit run` (the UI wraps these in its own helpers).
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency
+    msgpack = None
+
+import todo_instrumentation
+
+# --- Connection / Timeout Configuration ---
+# (connect timeout, read timeout) in seconds. Without a timeout a stalled
+# API Gateway endpoint would hang the Streamlit script thread forever.
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# How long (seconds) a fetched task list is served without asking the backend.
+# After that it is revalidated with a conditional GET.
+DEFAULT_CACHE_TTL = 30
+
+# Number of distinct hosts to keep pools for, and number of keep-alive
+# connections kept open per host. Streamlit runs one script thread per browser
+# session, so the per-host pool should be roughly the expected concurrency.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+
+# Endpoints kept by a SharedTaskListCache before the least recently used one
+# is evicted (one per backend URL the app's users have pointed it at).
+SHARED_CACHE_MAX_ENTRIES = 32
+
+# --- Wire Format Negotiation ---
+# Content codings we can decode: gzip and deflate always, br / zstd when
+# urllib3 finds the brotli / zstandard packages. API Gateway compresses
+# responses once the API's minimumCompressionSize is set.
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+
+# Task list representations, offered on list GETs. A backend that doesn't
+# know the compact ones just answers with plain JSON.
+#   columnar: {"tasks": {"taskId": [...], "title": [...], ...}} - each field
+#   name once instead of once per task, and like values next to each other,
+#   which compresses better
+#   msgpack:  the same columnar body as MessagePack (needs `msgpack`)
+JSON_TYPE = "application/json"
+COLUMNAR_TYPE = "application/vnd.todo.columnar+json"
+MSGPACK_TYPE = "application/vnd.todo.columnar+msgpack"
+
+# Set to False to only ever ask for plain JSON task lists.
+COMPACT_TASK_LISTS = True
+
+
+def task_list_headers(compact=None):
+    """Accept header for a task list GET, most compact representation first."""
+    if compact is None:
+        compact = COMPACT_TASK_LISTS
+    if not compact:
+        return {"Accept": JSON_TYPE}
+    types = [MSGPACK_TYPE] if msgpack is not None else []
+    types += [COLUMNAR_TYPE, f"{JSON_TYPE};q=0.5"]
+    return {"Accept": ", ".join(types)}
+
+
+def expand_columns(columns):
+    """{"field": [values...], ...} -> list of task dicts.
+
+    A null in a column means the task doesn't have that field, as in the
+    row-wise JSON.
+    """
+    names = list(columns)
+    rows = zip(*columns.values())
+    if not any(None in values for values in columns.values()):
+        return [dict(zip(names, row)) for row in rows]
+    return [
+        {name: value for name, value in zip(names, row) if value is not None}
+        for row in rows
+    ]
+
+
+def decode_body(response):
+    """Parses a response in any representation we offered, to plain JSON shape.
+
+    Columnar `tasks` are expanded back into the list of task dicts the rest of
+    the app works with.
+    """
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+    if content_type == MSGPACK_TYPE and msgpack is not None:
+        body = msgpack.unpackb(response.content)
+    else:
+        body = response.json()
+    if isinstance(body, dict) and isinstance(body.get("tasks"), dict):
+        body["tasks"] = expand_columns(body["tasks"])
+    return body
+
+
+def create_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+    """Builds a requests.Session with a keep-alive connection pool.
+
+    Reusing one session means the TCP + TLS handshake to API Gateway is paid
+    once per pooled connection instead of once per request.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=False,  # Open an extra (non-pooled) connection rather than wait
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "Connection": "keep-alive",
+            "Accept": JSON_TYPE,
+            "Accept-Encoding": ACCEPT_ENCODING,
+        }
+    )
+    return session
+
+
+def api_request(session, method, url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """Sends a request through `session`, always with a connect/read timeout.
+
+    When instrumentation is active, the call's route, status, size and wall
+    time are recorded.
+    """
+    collector = todo_instrumentation.current()
+    if collector is None:
+        return session.request(method, url, timeout=timeout, **kwargs)
+
+    status, nbytes = None, 0
+    started = time.perf_counter()
+    try:
+        response = session.request(method, url, timeout=timeout, **kwargs)
+        status = response.status_code
+        # Bytes on the wire: Content-Length is the compressed size
+        nbytes = response.headers.get("Content-Length")
+        if nbytes is None and not kwargs.get("stream"):
+            nbytes = len(response.content)
+        nbytes = int(nbytes or 0)
+        return response
+    finally:
+        collector.record_request(
+            method,
+            todo_instrumentation.url_template(url, kwargs.get("params")),
+            status,
+            nbytes,
+            time.perf_counter() - started,
+        )
+
+
+# --- Task List Cache ---
+class _CacheEntry:
+    __slots__ = ("tasks", "etag", "last_modified", "fetched_at", "ttl")
+
+    def __init__(self, tasks, etag=None, last_modified=None, ttl=None):
+        self.tasks = tasks
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.monotonic()
+        self.ttl = ttl  # None: use the cache's default
+
+
+class TaskListCache:
+    """Caches the `tasks` list per endpoint URL.
+
+    Entries younger than their TTL are returned as-is. Older entries are kept
+    around so their ETag / Last-Modified validators can be sent with the next
+    GET; an unchanged list then only costs a 304.
+
+    Not thread-safe: meant for one browser session (see SharedTaskListCache).
+    """
+
+    def __init__(self, ttl=DEFAULT_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        # Bumped by invalidate(): a fetch that started before an invalidation
+        # may have read the list from before the write, so it isn't stored.
+        self.generation = 0
+
+    def get(self, endpoint):
+        return self._entries.get(endpoint)
+
+    def is_fresh(self, entry):
+        if entry is None:
+            return False
+        ttl = self.ttl if entry.ttl is None else entry.ttl
+        return time.monotonic() - entry.fetched_at < ttl
+
+    def store(
+        self,
+        endpoint,
+        tasks,
+        etag=None,
+        last_modified=None,
+        ttl=None,
+        generation=None,
+    ):
+        entry = _CacheEntry(tasks, etag, last_modified, ttl)
+        if generation is None or generation == self.generation:
+            self._entries[endpoint] = entry
+        return entry
+
+    def revalidated(self, endpoint, entry):
+        """Restarts the TTL clock of `entry` after a 304."""
+        entry.fetched_at = time.monotonic()
+
+    def invalidate(self, endpoint=None):
+        """Drops the entry for `endpoint` (or everything if not given)."""
+        self.generation += 1
+        if endpoint is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(endpoint, None)
+
+    def single_flight(self, endpoint, fetch):
+        """Runs `fetch()` for `endpoint`; see SharedTaskListCache."""
+        return fetch()
+
+
+class _Flight:
+    """One in-flight fetch that other callers for the same key wait on."""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SharedTaskListCache(TaskListCache):
+    """Process-wide task list cache, safe to share between script threads.
+
+    On top of TaskListCache:
+
+    - single flight: while one caller is fetching an endpoint, other callers
+      for the same endpoint wait for its result (or exception) instead of
+      sending an identical GET of their own
+    - bounded: at most `max_entries` endpoints, least recently used evicted
+    - `stats` counts hits, fetches, coalesced waits and evictions
+    """
+
+    def __init__(self, ttl=DEFAULT_CACHE_TTL, max_entries=SHARED_CACHE_MAX_ENTRIES):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def get(self, endpoint):
+        with self._lock:
+            entry = self._entries.get(endpoint)
+            if entry is not None:
+                self._entries.move_to_end(endpoint)
+            return entry
+
+    def is_fresh(self, entry):
+        fresh = super().is_fresh(entry)
+        if fresh:
+            with self._lock:
+                self.stats["hits"] += 1
+        return fresh
+
+    def store(
+        self,
+        endpoint,
+        tasks,
+        etag=None,
+        last_modified=None,
+        ttl=None,
+        generation=None,
+    ):
+        entry = _CacheEntry(tasks, etag, last_modified, ttl)
+        with self._lock:
+            if generation is None or generation == self.generation:
+                self._entries[endpoint] = entry
+                self._entries.move_to_end(endpoint)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+        return entry
+
+    def revalidated(self, endpoint, entry):
+        with self._lock:
+            entry.fetched_at = time.monotonic()
+
+    def invalidate(self, endpoint=None):
+        with self._lock:
+            self.generation += 1
+            if endpoint is None:
+                self._entries.clear()
+                self._flights.clear()
+            else:
+                self._entries.pop(endpoint, None)
+                # Callers arriving from now on must not join a fetch that may
+                # predate the write; they start a new one.
+                self._flights.pop(endpoint, None)
+
+    def single_flight(self, endpoint, fetch):
+        with self._lock:
+            flight = self._flights.get(endpoint)
+            leader = flight is None
+            if leader:
+                flight = self._flights[endpoint] = _Flight()
+                self.stats["fetches"] += 1
+            else:
+                flight.waiters += 1
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fetch()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(endpoint) is flight:
+                    del self._flights[endpoint]
+            flight.done.set()
+
+
+def _cache_max_age(response):
+    """`max-age` from the response's Cache-Control header, or None."""
+    for directive in response.headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name.lower() in ("no-cache", "no-store"):
+            return 0
+        if name.lower() == "max-age":
+            try:
+                return max(0, int(value))
+            except ValueError:
+                return None
+    return None
+
+
+def fetch_task_list(session, endpoint, cache=None):
+    """GETs the task list, going through `cache` when one is given.
+
+    With a SharedTaskListCache, concurrent callers share one request.
+    Raises requests exceptions on HTTP/network errors like a plain GET would.
+    """
+    if cache is None:
+        return _get_task_list(session, endpoint, None)
+    entry = cache.get(endpoint)
+    if cache.is_fresh(entry):
+        return entry.tasks
+    return cache.single_flight(
+        endpoint, lambda: _get_task_list(session, endpoint, cache)
+    )
+
+
+def _get_task_list(session, endpoint, cache):
+    entry = cache.get(endpoint) if cache is not None else None
+    if cache is not None and cache.is_fresh(entry):
+        return entry.tasks  # Refreshed by a fetch that finished meanwhile
+    generation = cache.generation if cache is not None else None
+
+    headers = task_list_headers()
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+    response = api_request(session, "GET", endpoint, headers=headers)
+    if response.status_code == 304 and entry is not None:
+        # Unchanged on the server, just restart the TTL clock.
+        cache.revalidated(endpoint, entry)
+        return entry.tasks
+    response.raise_for_status()
+    # Assuming Chalice returns {'tasks': [...]}
+    tasks = decode_body(response).get("tasks", [])
+    if cache is not None:
+        cache.store(
+            endpoint,
+            tasks,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            ttl=_cache_max_age(response),
+            generation=generation,
+        )
+    return tasks
+
+
+# --- Single-task Calls (no Streamlit, safe to run from worker threads) ---
+def extract_error_detail(response):
+    """Best-effort error message out of a failed backend response."""
+    if response is None:
+        return "No additional details."
+    try:
+        body = response.json()
+        return body.get("Message", body.get("message", response.text))
+    except Exception:  # Not JSON, or not a JSON object
+        return response.text or "No additional details."
+
+
+def describe_error(exc):
+    """Formats a request exception the way the UI reports errors."""
+    response = getattr(exc, "response", None)
+    if response is not None:
+        return f"{exc} - Details: {extract_error_detail(response)}"
+    return str(exc)
+
+
+# Statuses worth retrying: timeouts, throttling (API Gateway answers 429 when
+# over its rate limit) and server-side errors.
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+def is_retryable(exc):
+    """True if a failed request may succeed when simply sent again."""
+    if not isinstance(exc, requests.exceptions.RequestException):
+        return False
+    response = exc.response
+    return response is None or response.status_code in RETRYABLE_STATUSES
+
+
+def create_task(session, endpoint, title, due_date):
+    """POSTs a new task and returns the backend's `task` object."""
+    response = api_request(
+        session, "POST", endpoint, json={"title": title, "dueDate": due_date}
+    )
+    response.raise_for_status()
+    return response.json().get("task", {})
+
+
+def update_task(session, endpoint, task_id, changes):
+    """PUTs `changes` for one task and returns the backend's `task` object."""
+    response = api_request(session, "PUT", f"{endpoint}/{task_id}", json=changes)
+    response.raise_for_status()
+    return response.json().get("task", {})
+
+
+def delete_task(session, endpoint, task_id):
+    """DELETEs one task and returns the backend's confirmation message."""
+    response = api_request(session, "DELETE", f"{endpoint}/{task_id}")
+    response.raise_for_status()
+    return response.json().get("message", f"Task '{task_id}' deleted successfully!")
+
+
+# --- Batch Endpoint ---
+# Optional backend route: POST {endpoint}/batch with
+#   {"operations": [{"op": "update", "taskId": ..., "changes": {...}},
+#                   {"op": "delete", "taskId": ...},
+#                   {"op": "create", "title": ..., "dueDate": ...}]}
+# answering {"results": [{"taskId": ..., "ok": true, "task": {...}}, ...]},
+# one result per operation, in order.
+# The backend advertises it by allowing POST in its OPTIONS response.
+def supports_batch(session, endpoint):
+    try:
+        response = api_request(session, "OPTIONS", f"{endpoint}/batch")
+    except requests.exceptions.RequestException:
+        return False
+    if not response.ok:
+        return False
+    allowed = response.headers.get("Allow") or response.headers.get(
+        "Access-Control-Allow-Methods", ""
+    )
+    return "POST" in allowed.upper()
+
+
+def batch_tasks(session, endpoint, operations):
+    """Sends several operations in one request and returns the `results` list."""
+    response = api_request(
+        session, "POST", f"{endpoint}/batch", json={"operations": operations}
+    )
+    response.raise_for_status()
+    return response.json().get("results", [])
+
+
+# --- Server-side Filtering / Cursor Pagination ---
+# Query parameters understood by backends that support them:
+#   status=pending|completed, dueBefore/dueAfter=YYYY-MM-DD, sort=<field> or
+#   -<field>, limit=<n>, cursor=<token>; the response then carries
+#   "nextCursor" while more pages are available.
+def build_task_query(
+    status=None, due_before=None, due_after=None, sort=None, limit=None, cursor=None
+):
+    params = {
+        "status": status,
+        "dueBefore": due_before,
+        "dueAfter": due_after,
+        "sort": sort,
+        "limit": limit,
+        "cursor": cursor,
+    }
+    return {k: v for k, v in params.items() if v is not None}
+
+
+def fetch_task_page(session, endpoint, params):
+    """GETs one page of tasks; returns (tasks, next_cursor or None)."""
+    response = api_request(
+        session, "GET", endpoint, params=params, headers=task_list_headers()
+    )
+    response.raise_for_status()
+    body = decode_body(response)
+    return body.get("tasks", []), body.get("nextCursor")
+
+
+class TaskCursor:
+    """Lazily walks a filtered, sorted task listing one page at a time.
+
+    Pages are only requested when `ensure()` asks for more tasks than are
+    loaded, so the completed history is never downloaded unless viewed.
+    """
+
+    def __init__(
+        self,
+        endpoint,
+        page_size,
+        status=None,
+        due_before=None,
+        due_after=None,
+        sort=None,
+    ):
+        self.endpoint = endpoint
+        self.status = status
+        self.params = build_task_query(
+            status=status,
+            due_before=due_before,
+            due_after=due_after,
+            sort=sort,
+            limit=page_size,
+        )
+        self.tasks = []
+        self.next_cursor = None
+        self.exhausted = False
+
+    @property
+    def has_more(self):
+        return not self.exhausted
+
+    def ensure(self, session, count):
+        """Loads pages until at least `count` tasks are loaded (or none are left)."""
+        while self.needs(count):
+            self.add_page(*fetch_task_page(session, self.endpoint, self.next_params()))
+        return self.tasks
+
+    # The steps of ensure(), also driven by the async client
+    def needs(self, count):
+        return len(self.tasks) < count and not self.exhausted
+
+    def next_params(self):
+        params = dict(self.params)
+        if self.next_cursor:
+            params["cursor"] = self.next_cursor
+        return params
+
+    def add_page(self, page, next_cursor):
+        self.next_cursor = next_cursor
+        if not page or not next_cursor:
+            self.exhausted = True
+        if self.status is not None:
+            # A backend that ignores `status` must not mix the sections
+            want_completed = self.status == "completed"
+            page = [
+                t for t in page if bool(t.get("completed", False)) == want_completed
+            ]
+        self.tasks.extend(page)
+
+
+# --- Delta Sync ---
+# GET {endpoint}?since=<mark> on a backend that supports it answers with only
+# the tasks changed after <mark>, deleted ones either flagged `"deleted": true`
+# (tombstones) or listed in "deletedTaskIds", plus the new "syncMark". The
+# syncMark is what tells a delta from a backend that ignored `since` (or an
+# empty "nothing changed" delta from an empty list), so an answer without one
+# is not trusted and the caller falls back to a full fetch.
+class TaskChanges:
+    __slots__ = ("tasks", "deleted_ids", "sync_mark")
+
+    def __init__(self, tasks, deleted_ids=(), sync_mark=None):
+        self.tasks = tasks
+        self.deleted_ids = list(deleted_ids)
+        self.sync_mark = sync_mark
+
+
+def parse_task_changes(body):
+    """TaskChanges for a `?since=` response body, or None if not a delta."""
+    if not isinstance(body, dict) or body.get("syncMark") is None:
+        return None
+    deleted_ids = list(body.get("deletedTaskIds", []))
+    changed = []
+    for task in body.get("tasks", []):
+        if task.get("deleted"):
+            deleted_ids.append(task.get("taskId"))
+        else:
+            changed.append(task)
+    return TaskChanges(changed, deleted_ids, body["syncMark"])
+
+
+def fetch_task_changes(session, endpoint, since):
+    """Asks for the tasks changed since `since`.
+
+    Returns a TaskChanges, or None if the backend rejected the parameter or
+    didn't answer with a delta, so the caller can fall back to a full fetch.
+    """
+    response = api_request(
+        session, "GET", endpoint, params={"since": since}, headers=task_list_headers()
+    )
+    if response.status_code in (400, 422, 501):
+        return None
+    response.raise_for_status()
+    return parse_task_changes(decode_body(response))
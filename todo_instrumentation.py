@@ -0,0 +1,316 @@
+"""Opt-in timing of backend requests and script runs.
+
+Nothing is recorded unless a Collector has been activated for the current
+context (the app does that per run when the sidebar diagnostics panel is
+switched on). When none is active, the hooks cost a single ContextVar lookup.
+"""
+
+import contextvars
+import json
+import re
+import threading
+import time
+from collections import Counter, deque
+from urllib.parse import parse_qs, urlsplit
+
+# How much history a collector keeps (oldest entries are dropped first).
+MAX_REQUESTS = 500
+MAX_RUNS = 100
+MAX_DEBUG_LINES = 200
+
+_active = contextvars.ContextVar("todo_instrumentation_collector", default=None)
+
+
+def current():
+    """The collector active in this context, or None when disabled."""
+    return _active.get()
+
+
+def activate(collector):
+    """Makes `collector` (or None, to disable) the active one for this context."""
+    _active.set(collector)
+
+
+# --- Helpers ---
+# ".../tasks/<id>" -> ".../tasks/{taskId}", leaving the /tasks/batch route alone
+_TASK_ID_SEGMENT = re.compile(r"/tasks/(?!batch(?:/|$))[^/]+")
+
+
+def url_template(url, params=None):
+    """Groups URLs by route: host + path with ids replaced + query keys."""
+    parts = urlsplit(url)
+    path = _TASK_ID_SEGMENT.sub("/tasks/{taskId}", parts.path)
+    keys = sorted(set(parse_qs(parts.query)) | set(params or ()))
+    return parts.netloc + path + ("?" + "&".join(keys) if keys else "")
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (q in 0..100) of `values`; None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # Ceiling, at least 1
+    return ordered[min(int(rank), len(ordered)) - 1]
+
+
+# --- Records ---
+class RequestRecord:
+    __slots__ = ("method", "url_template", "status", "bytes", "seconds", "at")
+
+    def __init__(self, method, url_template, status, nbytes, seconds):
+        self.method = method
+        self.url_template = url_template
+        self.status = status  # None if no response (timeout, connection error)
+        self.bytes = nbytes
+        self.seconds = seconds
+        self.at = time.time()
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class RunRecord:
+    """One script run (kind "script") or fragment rerun (kind "fragment")."""
+
+    __slots__ = (
+        "kind",
+        "started_at",
+        "total_seconds",
+        "fetch_seconds",
+        "request_count",
+        "widget_count",
+        "interrupted",
+    )
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.started_at = time.time()
+        self.total_seconds = 0.0
+        self.fetch_seconds = 0.0  # Sum of request wall times during the run
+        self.request_count = 0
+        self.widget_count = 0  # Widgets drawn for the task list
+        self.interrupted = False  # Ended by st.rerun()/st.stop(), not at the end
+
+    @property
+    def render_seconds(self):
+        return max(0.0, self.total_seconds - self.fetch_seconds)
+
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["render_seconds"] = self.render_seconds
+        return data
+
+
+class Collector:
+    """Keeps recent request and run records for one browser session.
+
+    Request records may come from worker threads (bulk actions), hence the lock.
+    Besides the bounded history it keeps running totals, which only clear()
+    resets: the Prometheus counters must never go down.
+    """
+
+    def __init__(self):
+        self.requests = deque(maxlen=MAX_REQUESTS)
+        self.runs = deque(maxlen=MAX_RUNS)
+        self.debug_lines = deque(maxlen=MAX_DEBUG_LINES)
+        self.request_totals = Counter()  # (method, route, status) -> count
+        self.request_seconds = Counter()  # (method, route) -> seconds
+        self.response_bytes = Counter()  # (method, route) -> bytes
+        self.run_totals = Counter()  # kind -> count
+        self.run_seconds = Counter()  # kind -> seconds
+        self._lock = threading.Lock()
+        self._run = None
+        self._run_started = None
+        self._run_thread = None
+
+    # --- Runs ---
+    def in_script_run(self):
+        """True while a full script run is executing on the calling thread.
+
+        Fragments drawn as part of a full run are counted in that run; fragment
+        reruns get a run record of their own.
+        """
+        return (
+            self._run is not None
+            and self._run.kind == "script"
+            and self._run_thread == threading.get_ident()
+        )
+
+    def start_run(self, kind="script"):
+        # A run cut short by st.rerun() never reached finish_run(); the next
+        # run starts right away, so closing it now keeps its timing accurate.
+        if self._run is not None:
+            self.finish_run(interrupted=True)
+        self._run = RunRecord(kind)
+        self._run_started = time.perf_counter()
+        self._run_thread = threading.get_ident()
+
+    def finish_run(self, interrupted=False):
+        run = self._run
+        if run is None:
+            return None
+        run.total_seconds = time.perf_counter() - self._run_started
+        run.interrupted = interrupted
+        self._run = None
+        self.runs.append(run)
+        self.run_totals[run.kind] += 1
+        self.run_seconds[run.kind] += run.total_seconds
+        return run
+
+    def clear(self):
+        with self._lock:
+            self.requests.clear()
+            self.request_totals.clear()
+            self.request_seconds.clear()
+            self.response_bytes.clear()
+        self.runs.clear()
+        self.run_totals.clear()
+        self.run_seconds.clear()
+        self.debug_lines.clear()
+
+    def add_widgets(self, count):
+        run = self._run
+        if run is not None:
+            run.widget_count += count
+
+    # --- Requests ---
+    def record_request(self, method, url_template, status, nbytes, seconds):
+        record = RequestRecord(method, url_template, status, nbytes, seconds)
+        route = (method, url_template)
+        with self._lock:
+            self.requests.append(record)
+            self.request_totals[route + (str(status or "error"),)] += 1
+            self.request_seconds[route] += seconds
+            self.response_bytes[route] += nbytes
+            run = self._run
+            if run is not None:
+                run.request_count += 1
+                run.fetch_seconds += seconds
+
+    def debug(self, message):
+        self.debug_lines.append(f"{time.strftime('%H:%M:%S')} {message}")
+
+    # --- Reports ---
+    def route_summary(self):
+        """Per (method, route): count, errors, bytes and latency percentiles."""
+        groups = {}
+        with self._lock:
+            records = list(self.requests)
+        for r in records:
+            groups.setdefault((r.method, r.url_template), []).append(r)
+        summary = []
+        for (method, route), group in sorted(groups.items()):
+            seconds = [r.seconds for r in group]
+            summary.append(
+                {
+                    "method": method,
+                    "route": route,
+                    "count": len(group),
+                    "errors": sum(
+                        1 for r in group if r.status is None or r.status >= 400
+                    ),
+                    "bytes": sum(r.bytes for r in group),
+                    "p50_ms": percentile(seconds, 50) * 1000,
+                    "p95_ms": percentile(seconds, 95) * 1000,
+                    "max_ms": max(seconds) * 1000,
+                }
+            )
+        return summary
+
+    def to_json(self):
+        with self._lock:
+            requests_ = [r.as_dict() for r in self.requests]
+        return json.dumps(
+            {
+                "requests": requests_,
+                "runs": [r.as_dict() for r in self.runs],
+                "routes": self.route_summary(),
+            },
+            indent=2,
+        )
+
+    def to_prometheus(self):
+        """Prometheus text exposition.
+
+        Counters and summary _sum / _count are running totals; the summary
+        quantiles are over the retained window of records.
+        """
+        with self._lock:
+            records = list(self.requests)
+            request_totals = dict(self.request_totals)
+            request_seconds = dict(self.request_seconds)
+            response_bytes = dict(self.response_bytes)
+        lines = [
+            "# HELP todo_api_requests_total Backend requests.",
+            "# TYPE todo_api_requests_total counter",
+        ]
+        request_counts = Counter()
+        for (method, route, status), count in sorted(request_totals.items()):
+            request_counts[(method, route)] += count
+            labels = _labels(method=method, route=route, status=status)
+            lines.append(f"todo_api_requests_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP todo_api_request_seconds Backend request wall time.",
+            "# TYPE todo_api_request_seconds summary",
+        ]
+        window = {}
+        for r in records:
+            window.setdefault((r.method, r.url_template), []).append(r.seconds)
+        for (method, route), total in sorted(request_seconds.items()):
+            lines += _quantile_lines(
+                "todo_api_request_seconds",
+                window.get((method, route)),
+                method=method,
+                route=route,
+            )
+            labels = _labels(method=method, route=route)
+            lines.append(f"todo_api_request_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(
+                f"todo_api_request_seconds_count{{{labels}}}"
+                f" {request_counts[(method, route)]}"
+            )
+
+        lines += [
+            "# HELP todo_api_response_bytes_total Response body bytes received.",
+            "# TYPE todo_api_response_bytes_total counter",
+        ]
+        for (method, route), total in sorted(response_bytes.items()):
+            labels = _labels(method=method, route=route)
+            lines.append(f"todo_api_response_bytes_total{{{labels}}} {total}")
+
+        lines += [
+            "# HELP todo_script_run_seconds Script / fragment run wall time.",
+            "# TYPE todo_script_run_seconds summary",
+        ]
+        by_kind = {}
+        for run in self.runs:
+            by_kind.setdefault(run.kind, []).append(run.total_seconds)
+        for kind, total in sorted(self.run_seconds.items()):
+            lines += _quantile_lines(
+                "todo_script_run_seconds", by_kind.get(kind), kind=kind
+            )
+            labels = _labels(kind=kind)
+            lines.append(f"todo_script_run_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(
+                f"todo_script_run_seconds_count{{{labels}}} {self.run_totals[kind]}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _quantile_lines(name, values, **labels):
+    """Summary quantile samples over `values` (none if the window has none)."""
+    if not values:
+        return []
+    lines = []
+    for q in (0.5, 0.95, 0.99):
+        sample_labels = _labels(**labels, quantile=str(q))
+        lines.append(f"{name}{{{sample_labels}}} {percentile(values, q * 100):.6f}")
+    return lines
+
+
+def _labels(**labels):
+    def escape(value):
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{name}="{escape(value)}"' for name, value in labels.items())
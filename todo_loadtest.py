@@ -0,0 +1,356 @@
+"""Multi-session load generator for the to-do app and its backend.
+
+Simulates N concurrent users, each opening the app and then clicking around
+with a weighted mix of operations (with random think time in between):
+
+    refresh  - reload the list (conditional GET, like a resync)
+    check    - tick a pending task as completed
+    edit     - Edit -> change title / due date -> Save Changes
+    add      - add a task from the sidebar form
+    delete   - delete a task
+
+and reports throughput plus p50/p95/p99 latency and error rate per operation.
+All users share one task list, so some 404s are expected: a user acting on a
+task another user has just deleted, as would happen with real users.
+
+Two modes:
+
+    http  Each user issues the requests the app would make for each click,
+          through one shared pooled session, as the Streamlit server does.
+          Measures the backend (API Gateway / Lambda / DynamoDB, or the
+          stand-in).
+    app   Each user is a headless copy of todo_streamlit_app.py (Streamlit
+          AppTest) and each click is a real script rerun. AppTest can only
+          execute one script at a time per process, so reruns are serialized;
+          latencies include waiting behind other users' reruns, which is how a
+          single (GIL-bound) Streamlit server process behaves under load.
+
+Without --url an in-process stand-in backend is started.
+
+    python todo_loadtest.py --sessions 50 --duration 30
+    python todo_loadtest.py --mode app --sessions 10 --tasks 500
+    python todo_loadtest.py --url https://.../api/tasks --mix check=50,refresh=50
+"""
+
+import argparse
+import logging
+import os
+import random
+import threading
+import time
+from datetime import date, timedelta
+
+import todo_client
+from todo_instrumentation import percentile
+from todo_standin_server import StandInServer
+
+OPERATIONS = ("refresh", "check", "edit", "add", "delete")
+DEFAULT_MIX = {"refresh": 30, "check": 30, "edit": 20, "add": 12, "delete": 8}
+
+APP_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "todo_streamlit_app.py"
+)
+
+
+class LoadStats:
+    """Latencies and error counts per operation, shared by all users."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.error_samples = []
+
+    def record(self, op, seconds, error=None):
+        with self._lock:
+            self.latencies.setdefault(op, []).append(seconds)
+            if error is not None:
+                self.errors[op] = self.errors.get(op, 0) + 1
+                if len(self.error_samples) < 10:
+                    self.error_samples.append(f"{op}: {error}")
+
+    def rows(self):
+        rows = []
+        for op in ("open",) + OPERATIONS:
+            values = self.latencies.get(op)
+            if not values:
+                continue
+            errors = self.errors.get(op, 0)
+            rows.append(
+                {
+                    "op": op,
+                    "count": len(values),
+                    "errors": errors,
+                    "error_pct": 100.0 * errors / len(values),
+                    "p50_ms": percentile(values, 50) * 1000,
+                    "p95_ms": percentile(values, 95) * 1000,
+                    "p99_ms": percentile(values, 99) * 1000,
+                }
+            )
+        return rows
+
+
+def _new_title(rng):
+    return f"Load test task {rng.randrange(10**6)}"
+
+
+def _new_due_date(rng):
+    return (date.today() + timedelta(days=rng.randint(0, 30))).isoformat()
+
+
+class HttpUser:
+    """Issues the backend requests the app makes for each click."""
+
+    def __init__(self, http, endpoint, rng):
+        self.http = http
+        self.endpoint = endpoint
+        self.rng = rng
+        # ttl=0: every refresh revalidates (304 when unchanged)
+        self.cache = todo_client.TaskListCache(ttl=0)
+        self.tasks = {}
+
+    def open(self):
+        self.refresh()
+
+    def refresh(self):
+        tasks = todo_client.fetch_task_list(self.http, self.endpoint, self.cache)
+        self.tasks = {t["taskId"]: t for t in tasks if t.get("taskId")}
+
+    def _pick(self, pending_only):
+        candidates = [
+            t for t in self.tasks.values() if not (pending_only and t.get("completed"))
+        ]
+        return self.rng.choice(candidates) if candidates else None
+
+    def do(self, op):
+        if op == "refresh":
+            return self.refresh()
+        if op == "add":
+            task = todo_client.create_task(
+                self.http, self.endpoint, _new_title(self.rng), _new_due_date(self.rng)
+            )
+            self.tasks[task["taskId"]] = task
+            return
+        task = self._pick(pending_only=op != "delete")
+        if task is None:
+            return self.do("add")  # Nothing left to act on
+        task_id = task["taskId"]
+        if op == "delete":
+            self.tasks.pop(task_id, None)
+            todo_client.delete_task(self.http, self.endpoint, task_id)
+        else:
+            if op == "check":
+                changes = {"completed": True}
+            else:
+                changes = {
+                    "title": _new_title(self.rng),
+                    "dueDate": _new_due_date(self.rng),
+                }
+            self.tasks[task_id] = todo_client.update_task(
+                self.http, self.endpoint, task_id, changes
+            )
+
+
+class AppUser:
+    """Drives a headless copy of the Streamlit app (see the module docstring)."""
+
+    # AppTest sets up a process-wide mock runtime per run
+    _run_lock = threading.Lock()
+
+    def __init__(self, rng, timeout=120):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = rng
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    def _run(self, element=None):
+        with self._run_lock:
+            (element or self.at).run()
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+        if self.at.error:
+            raise RuntimeError(self.at.error[0].value)
+
+    def _keyed(self, elements, prefix="", suffix=""):
+        return [
+            e
+            for e in elements
+            if e.key and e.key.startswith(prefix) and e.key.endswith(suffix)
+        ]
+
+    def open(self):
+        self._run()
+
+    def do(self, op):
+        at = self.at
+        if op == "refresh":
+            return self._run(at.button(key="refresh_tasks_button").click())
+        if op == "add":
+            at.text_input(key="new_title_input").set_value(_new_title(self.rng))
+            return self._run(
+                at.button(key="FormSubmitter:new_task_form-Add Task").click()
+            )
+        if op == "check":
+            boxes = self._keyed(at.checkbox, prefix="pending_", suffix="_check")
+            if not boxes:
+                return self.do("add")
+            return self._run(self.rng.choice(boxes).check())
+        if op == "delete":
+            buttons = self._keyed(at.button, suffix="_del")
+            if not buttons:
+                return self.do("add")
+            return self._run(self.rng.choice(buttons).click())
+        # edit: open the editor, change the title, save
+        buttons = self._keyed(at.button, suffix="_edit_action")
+        if not buttons:
+            return self.do("add")
+        self._run(self.rng.choice(buttons).click())
+        title_input = self._keyed(at.text_input, suffix="_edit_title_input")[0]
+        title_input.set_value(_new_title(self.rng))
+        save = self._keyed(at.button, prefix="FormSubmitter:", suffix="Save Changes")
+        self._run(save[0].click())
+
+
+def _user_loop(make_user, mix, deadline, think, stats, seed):
+    rng = random.Random(seed)
+    ops, weights = zip(*mix.items())
+    started = time.perf_counter()
+    try:
+        user = make_user(rng)
+        user.open()
+    except Exception as e:
+        stats.record("open", time.perf_counter() - started, e)
+        return
+    stats.record("open", time.perf_counter() - started)
+
+    while time.monotonic() < deadline:
+        op = rng.choices(ops, weights)[0]
+        started = time.perf_counter()
+        try:
+            user.do(op)
+        except Exception as e:
+            stats.record(op, time.perf_counter() - started, e)
+        else:
+            stats.record(op, time.perf_counter() - started)
+        if think > 0:
+            time.sleep(rng.expovariate(1.0 / think))
+
+
+def run_load(endpoint, sessions, duration, mix=None, think=0.5, mode="http", seed=0):
+    """Runs the load and returns (LoadStats, wall seconds)."""
+    mix = mix or DEFAULT_MIX
+    if mode == "app":
+        os.environ["TODO_API_URL"] = endpoint
+
+        def make_user(rng):
+            return AppUser(rng)
+
+    else:
+        # One pool shared by all users, like the app's st.cache_resource session
+        http = todo_client.create_session(pool_maxsize=max(sessions, 1))
+
+        def make_user(rng):
+            return HttpUser(http, endpoint, rng)
+
+    stats = LoadStats()
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(
+            target=_user_loop,
+            args=(make_user, mix, deadline, think, stats, seed + i),
+            name=f"loadtest-user-{i}",
+            daemon=True,
+        )
+        for i in range(sessions)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, time.perf_counter() - started
+
+
+def parse_mix(text):
+    """'check=40,edit=20' -> {'check': 40.0, 'edit': 20.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation '{name}'")
+        mix[name] = float(weight)
+    return mix
+
+
+def format_report(stats, wall_seconds, backend_requests=None):
+    rows = stats.rows()
+    total = sum(r["count"] for r in rows if r["op"] != "open")
+    lines = [
+        f"{'op':<8} {'count':>7} {'err%':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    ]
+    for r in rows:
+        lines.append(
+            f"{r['op']:<8} {r['count']:>7} {r['error_pct']:>6.1f}"
+            f" {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+        )
+    lines.append(
+        f"\n{total} operations in {wall_seconds:.1f}s"
+        f" = {total / wall_seconds:.1f} ops/s"
+    )
+    if backend_requests is not None:
+        lines.append(
+            f"{backend_requests} backend requests"
+            f" = {backend_requests / wall_seconds:.1f} req/s"
+        )
+    if stats.error_samples:
+        lines.append("\nSample errors:")
+        lines.extend(f"  {sample}" for sample in stats.error_samples)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the to-do app.")
+    parser.add_argument("--mode", choices=["http", "app"], default="http")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds")
+    parser.add_argument(
+        "--think", type=float, default=0.5, help="Mean think time between clicks (s)"
+    )
+    parser.add_argument(
+        "--mix", type=parse_mix, help="Operation weights, e.g. check=40,edit=20"
+    )
+    parser.add_argument("--url", help="Backend /tasks URL (default: local stand-in)")
+    parser.add_argument("--tasks", type=int, default=200, help="Stand-in dataset size")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Stand-in latency per request (s)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Streamlit logs a warning per unlabeled widget in app mode
+    logging.disable(logging.WARNING)
+
+    server = None
+    endpoint = args.url
+    if endpoint is None:
+        server = StandInServer(task_count=args.tasks, latency=args.latency).start()
+        endpoint = server.url
+    try:
+        stats, wall = run_load(
+            endpoint,
+            args.sessions,
+            args.duration,
+            mix=args.mix,
+            think=args.think,
+            mode=args.mode,
+            seed=args.seed,
+        )
+    finally:
+        if server is not None:
+            server.stop()
+    print(format_report(stats, wall, server.request_count if server else None))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+"""In-process stand-in for the Chalice to-do backend.
+
+Implements the /tasks contract the app's helpers expect:
+
+    GET    /api/tasks              -> {"tasks": [...]}  (ETag / If-None-Match)
+    POST   /api/tasks              -> {"task": {...}}
+    PUT    /api/tasks/<taskId>     -> {"task": {...}}
+    DELETE /api/tasks/<taskId>     -> {"message": "..."}
+
+plus the optional extensions the client can use: status/dueBefore/dueAfter/
+sort/limit/cursor query parameters with "nextCursor", delta sync through
+`?since=<syncMark>`, POST /api/tasks/batch, the compact columnar / MessagePack
+task list representations (by Accept header), and gzip / brotli compression
+of responses of MIN_COMPRESSION_SIZE bytes or more (by Accept-Encoding).
+Errors look like Chalice's ({"Code": ..., "Message": ...}).
+
+Used by the benchmark and load-test scripts; can also be run on its own:
+
+    python todo_standin_server.py --port 8000 --tasks 1000 --latency 0.05
+
+and then point the app at http://127.0.0.1:8000/api/tasks.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from todo_client import COLUMNAR_TYPE, JSON_TYPE, MSGPACK_TYPE
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+try:
+    import msgpack
+except ImportError:  # Optional: no MessagePack representation
+    msgpack = None
+
+# Smallest response body that gets compressed (like API Gateway's
+# minimumCompressionSize; tiny bodies only grow).
+MIN_COMPRESSION_SIZE = 1024
+
+# Representation -> ETag suffix (an ETag must differ per representation).
+_ETAG_SUFFIXES = {JSON_TYPE: "", COLUMNAR_TYPE: "-c", MSGPACK_TYPE: "-m"}
+
+_WORDS = (
+    "buy call email fix plan review write read book pay clean send update "
+    "prepare schedule check order renew cancel backup deploy test draft "
+    "milk groceries report invoice dentist taxes car garden meeting slides"
+).split()
+
+
+class TaskBackend:
+    """Thread-safe in-memory task table with a change counter for delta sync."""
+
+    def __init__(self, task_count=0, seed=0):
+        self._lock = threading.Lock()
+        self._tasks = {}
+        self._tombstones = {}  # taskId -> version at which it was deleted
+        self.version = 0
+        rng = random.Random(seed)
+        today = date.today()
+        for _ in range(task_count):
+            self._insert(
+                {
+                    "title": " ".join(rng.sample(_WORDS, 3)).capitalize(),
+                    "dueDate": (
+                        today + timedelta(days=rng.randint(-30, 60))
+                    ).isoformat(),
+                    "completed": rng.random() < 0.3,
+                }
+            )
+
+    def _insert(self, fields):
+        self.version += 1
+        task = {
+            "taskId": str(uuid.uuid4()),
+            "title": fields["title"],
+            "dueDate": fields["dueDate"],
+            "completed": bool(fields.get("completed", False)),
+            "version": self.version,
+        }
+        self._tasks[task["taskId"]] = task
+        return task
+
+    @property
+    def etag(self):
+        return f'"v{self.version}"'
+
+    def __len__(self):
+        return len(self._tasks)
+
+    # --- Reads ---
+    def list(self, query):
+        """Returns the response body for GET /tasks with `query` parameters."""
+        with self._lock:
+            if "since" in query:
+                return self._changes_since(query["since"])
+            tasks = list(self._tasks.values())
+        status = query.get("status")
+        if status in ("pending", "completed"):
+            want_completed = status == "completed"
+            tasks = [t for t in tasks if t["completed"] == want_completed]
+        if "dueAfter" in query:
+            tasks = [t for t in tasks if t["dueDate"] >= query["dueAfter"]]
+        if "dueBefore" in query:
+            tasks = [t for t in tasks if t["dueDate"] < query["dueBefore"]]
+        sort = query.get("sort")
+        if sort and sort.lstrip("-") in ("dueDate", "title"):
+            tasks.sort(key=lambda t: t[sort.lstrip("-")], reverse=sort.startswith("-"))
+        if "limit" not in query:
+            return {"tasks": tasks}
+        # The cursor is just the offset; good enough for a stand-in
+        offset = int(query.get("cursor", 0))
+        limit = int(query["limit"])
+        body = {"tasks": tasks[offset : offset + limit]}
+        if offset + limit < len(tasks):
+            body["nextCursor"] = str(offset + limit)
+        return body
+
+    def _changes_since(self, since):
+        since = int(since)
+        return {
+            "tasks": [t for t in self._tasks.values() if t["version"] > since],
+            "deletedTaskIds": [
+                task_id
+                for task_id, version in self._tombstones.items()
+                if version > since
+            ],
+            "syncMark": self.version,
+        }
+
+    # --- Writes ---
+    def create(self, fields):
+        with self._lock:
+            return self._insert(fields)
+
+    def update(self, task_id, changes):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            self.version += 1
+            updated = dict(task)
+            for field in ("title", "dueDate", "completed"):
+                if field in changes:
+                    updated[field] = changes[field]
+            updated["version"] = self.version
+            self._tasks[task_id] = updated
+            return updated
+
+    def delete(self, task_id):
+        with self._lock:
+            if self._tasks.pop(task_id, None) is None:
+                return False
+            self.version += 1
+            self._tombstones[task_id] = self.version
+            return True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like API Gateway
+
+    # Set on the subclass created per server
+    backend = None
+    base_path = "/api/tasks"
+    latency = 0.0
+    counts = None
+    counts_lock = None
+
+    def log_message(self, format, *args):
+        pass  # Quiet; the benchmark reports request counts instead
+
+    # --- Plumbing ---
+    def _route(self):
+        """Returns (task_id, query dict).
+
+        task_id is None for the collection itself, an id (or "batch") for a
+        sub-resource, and False for paths outside the API.
+        """
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        path = parts.path.rstrip("/")
+        if path == self.base_path:
+            return None, query
+        if path.startswith(self.base_path + "/"):
+            rest = path[len(self.base_path) + 1 :]
+            if "/" not in rest:
+                return rest, query
+        return False, query
+
+    def _start(self):
+        with self.counts_lock:
+            self.counts[self.command] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _negotiate_type(self):
+        """The first task list representation in Accept that we can produce."""
+        for part in self.headers.get("Accept", "").split(","):
+            content_type = part.split(";")[0].strip()
+            if content_type == COLUMNAR_TYPE or (
+                content_type == MSGPACK_TYPE and msgpack is not None
+            ):
+                return content_type
+        return JSON_TYPE
+
+    def _encode(self, body, content_type):
+        if content_type == JSON_TYPE:
+            return json.dumps(body).encode()
+        tasks = body["tasks"]
+        fields = list(dict.fromkeys(field for task in tasks for field in task))
+        body = dict(body, tasks={f: [t.get(f) for t in tasks] for f in fields})
+        if content_type == MSGPACK_TYPE:
+            return msgpack.packb(body)
+        return json.dumps(body, separators=(",", ":")).encode()
+
+    def _compress(self, data):
+        """Returns (data, Content-Encoding or None) per Accept-Encoding."""
+        if len(data) < MIN_COMPRESSION_SIZE:
+            return data, None
+        accepted = {
+            part.split(";")[0].strip().lower()
+            for part in self.headers.get("Accept-Encoding", "").split(",")
+        }
+        if "br" in accepted and brotli is not None:
+            return brotli.compress(data, quality=5), "br"
+        if "gzip" in accepted:
+            return gzip.compress(data, compresslevel=6), "gzip"
+        return data, None
+
+    def _send(self, status, body, headers=None, content_type=JSON_TYPE):
+        data = self._encode(body, content_type) if body is not None else b""
+        data, encoding = self._compress(data)
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", content_type)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Vary", "Accept, Accept-Encoding")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # Client gave up (e.g. cancelled)
+
+    def _error(self, status, code, message):
+        self._send(status, {"Code": code, "Message": f"{code}: {message}"})
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return None
+
+    # --- Methods ---
+    def do_GET(self):
+        self._start()
+        task_id, query = self._route()
+        if task_id is not None:
+            return self._error(404, "NotFoundError", self.path)
+        plain = not query
+        content_type = self._negotiate_type()
+        # Read before listing: never newer than the body
+        etag = self.backend.etag[:-1] + _ETAG_SUFFIXES[content_type] + '"'
+        if plain and self.headers.get("If-None-Match") == etag:
+            return self._send(304, None, {"ETag": etag})
+        body = self.backend.list(query)
+        self._send(200, body, {"ETag": etag} if plain else None, content_type)
+
+    def do_POST(self):
+        self._start()
+        task_id, _ = self._route()
+        body = self._body()
+        if body is None:
+            return self._error(400, "BadRequestError", "Body must be JSON")
+        if task_id == "batch":
+            return self._send(200, {"results": self._batch(body.get("operations", []))})
+        if task_id is not None:
+            return self._error(404, "NotFoundError", self.path)
+        if not body.get("title") or not body.get("dueDate"):
+            return self._error(400, "BadRequestError", "title and dueDate are required")
+        self._send(201, {"task": self.backend.create(body)})
+
+    def do_PUT(self):
+        self._start()
+        task_id, _ = self._route()
+        body = self._body()
+        if not task_id or task_id == "batch":
+            return self._error(404, "NotFoundError", self.path)
+        if body is None:
+            return self._error(400, "BadRequestError", "Body must be JSON")
+        task = self.backend.update(task_id, body)
+        if task is None:
+            return self._error(404, "NotFoundError", f"Task '{task_id}' not found")
+        self._send(200, {"task": task})
+
+    def do_DELETE(self):
+        self._start()
+        task_id, _ = self._route()
+        if not task_id or not self.backend.delete(task_id):
+            return self._error(404, "NotFoundError", f"Task '{task_id}' not found")
+        self._send(200, {"message": f"Task '{task_id}' deleted successfully."})
+
+    def do_OPTIONS(self):
+        self._start()
+        task_id, _ = self._route()
+        allowed = "OPTIONS,POST" if task_id == "batch" else "GET,POST,PUT,DELETE"
+        self._send(200, None, {"Allow": allowed})
+
+    def _batch(self, operations):
+        results = []
+        for op in operations:
+            task_id = op.get("taskId")
+            if op.get("op") == "create":
+                if not op.get("title") or not op.get("dueDate"):
+                    results.append(
+                        {
+                            "taskId": None,
+                            "ok": False,
+                            "task": None,
+                            "error": "title and dueDate are required",
+                        }
+                    )
+                    continue
+                task = self.backend.create(op)
+                results.append({"taskId": task["taskId"], "ok": True, "task": task})
+                continue
+            if op.get("op") == "delete":
+                ok = self.backend.delete(task_id)
+                results.append({"taskId": task_id, "ok": ok, "task": None})
+            else:
+                task = self.backend.update(task_id, op.get("changes", {}))
+                results.append(
+                    {"taskId": task_id, "ok": task is not None, "task": task}
+                )
+            if not results[-1]["ok"]:
+                results[-1]["error"] = f"Task '{task_id}' not found"
+        return results
+
+
+class StandInServer:
+    """Runs the stand-in backend on a background thread.
+
+    Usage:
+        with StandInServer(task_count=1000, latency=0.02) as server:
+            ...  # point the app at server.url
+    """
+
+    def __init__(
+        self,
+        task_count=0,
+        latency=0.0,
+        host="127.0.0.1",
+        port=0,
+        base_path="/api/tasks",
+        seed=0,
+    ):
+        self.backend = TaskBackend(task_count, seed=seed)
+        self.counts = Counter()
+        handler = type(
+            "StandInHandler",
+            (_Handler,),
+            {
+                "backend": self.backend,
+                "base_path": base_path,
+                "latency": latency,
+                "counts": self.counts,
+                "counts_lock": threading.Lock(),
+            },
+        )
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+        self.url = f"http://{host}:{self._httpd.server_port}{base_path}"
+
+    @property
+    def request_count(self):
+        return sum(self.counts.values())
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="todo-standin", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serves on the calling thread (for running the stand-in on its own)."""
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--tasks", type=int, default=100, help="Tasks to seed")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to each request"
+    )
+    args = parser.parse_args()
+    server = StandInServer(
+        task_count=args.tasks, latency=args.latency, host=args.host, port=args.port
+    )
+    print(f"Stand-in backend with {args.tasks} tasks at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,321 @@
+"""Session-side copy of the task list, indexed by taskId.
+
+The UI reads from this store instead of re-downloading the list after every
+click. Mutations are applied locally first (optimistically), then confirmed
+with the task object the backend returns, or rolled back if the call fails.
+
+The store also maintains a TaskIndex (parsed due dates, per-state lists and a
+due-date ordering) and a TitleSearchIndex, so reruns don't rescan or reparse
+the whole list.
+"""
+
+import re
+import time
+from bisect import bisect_left, insort
+from datetime import date
+
+# Marker used in snapshots for "task did not exist before the change".
+_MISSING = object()
+
+
+def high_water_mark(tasks, current=None):
+    """Latest `updatedAt` (or `version`) among `tasks`, never below `current`.
+
+    Tasks without either field are ignored; returns `current` if none has one.
+    """
+    marks = [t.get("updatedAt", t.get("version")) for t in tasks]
+    marks = [m for m in marks if m is not None]
+    if current is not None:
+        marks.append(current)
+    return max(marks) if marks else None
+
+
+# Sort key for tasks without a (valid) due date: after every real date.
+_NO_DUE_KEY = date.max.toordinal() + 1
+
+
+def parse_due_date(value):
+    """'YYYY-MM-DD' -> date, or None if missing / malformed."""
+    try:
+        return date.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TaskRecord:
+    """A task dict with the fields the UI uses pulled out, and parsed, once."""
+
+    __slots__ = ("task_id", "title", "due", "completed", "data")
+
+    def __init__(self, data):
+        self.data = data  # The original dict, as the backend sent it
+        self.task_id = data.get("taskId")
+        self.title = data.get("title", "")
+        self.due = parse_due_date(data.get("dueDate"))
+        self.completed = bool(data.get("completed", False))
+
+    @property
+    def due_key(self):
+        return self.due.toordinal() if self.due else _NO_DUE_KEY
+
+
+class TaskIndex:
+    """Lookup structures over a set of tasks.
+
+    - by taskId (dict, O(1))
+    - by completion state, in listing order
+    - by due date per completion state: a sorted list of (due_key, taskId)
+      that range queries bisect into instead of scanning
+    """
+
+    def __init__(self, tasks=()):
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        records = [TaskRecord(t) for t in tasks if t.get("taskId")]
+        self._by_id = {r.task_id: r for r in records}
+        self._by_state = {False: {}, True: {}}
+        for record in records:
+            self._by_state[record.completed][record.task_id] = record
+        self._by_due = {
+            state: sorted((r.due_key, r.task_id) for r in by_state.values())
+            for state, by_state in self._by_state.items()
+        }
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def get(self, task_id):
+        return self._by_id.get(task_id)
+
+    def add(self, task):
+        """Inserts or replaces one task.
+
+        A replaced task keeps its listing position unless its state changed.
+        """
+        record = TaskRecord(task)
+        old = self._by_id.get(record.task_id)
+        if old is not None:
+            self._remove_due_key(old)
+            if old.completed != record.completed:
+                del self._by_state[old.completed][old.task_id]
+        self._by_id[record.task_id] = record
+        self._by_state[record.completed][record.task_id] = record
+        insort(self._by_due[record.completed], (record.due_key, record.task_id))
+
+    def discard(self, task_id):
+        old = self._by_id.pop(task_id, None)
+        if old is not None:
+            del self._by_state[old.completed][task_id]
+            self._remove_due_key(old)
+
+    def _remove_due_key(self, record):
+        keys = self._by_due[record.completed]
+        i = bisect_left(keys, (record.due_key, record.task_id))
+        if i < len(keys) and keys[i] == (record.due_key, record.task_id):
+            del keys[i]
+
+    # --- Queries ---
+    def listed(self, completed):
+        """Records in one completion state, in the order the backend listed them."""
+        return list(self._by_state[completed].values())
+
+    def by_due(self, completed, start=None, end=None):
+        """Records in one completion state ordered by due date.
+
+        `start` (inclusive) / `end` (exclusive) are dates limiting the range;
+        undated tasks come last and are only included when `end` is None.
+        """
+        keys = self._by_due[completed]
+        lo = bisect_left(keys, (start.toordinal(),)) if start else 0
+        hi = bisect_left(keys, (end.toordinal(),)) if end else len(keys)
+        return [self._by_id[task_id] for _, task_id in keys[lo:hi]]
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class TitleSearchIndex:
+    """Inverted index over task titles with prefix matching.
+
+    token -> set of taskIds, plus the distinct tokens kept sorted so a prefix
+    lookup is a bisect followed by a short walk. Updated per task, never
+    rebuilt on a search.
+    """
+
+    def __init__(self, tasks=()):
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        self._postings = {}
+        self._tokens_by_id = {}
+        for task in tasks:
+            task_id = task.get("taskId")
+            if task_id:
+                tokens = frozenset(tokenize(task.get("title")))
+                self._tokens_by_id[task_id] = tokens
+                for token in tokens:
+                    self._postings.setdefault(token, set()).add(task_id)
+        self._sorted_tokens = sorted(self._postings)
+
+    def add(self, task):
+        """Indexes (or re-indexes) one task's title."""
+        task_id = task.get("taskId")
+        tokens = frozenset(tokenize(task.get("title")))
+        if self._tokens_by_id.get(task_id) == tokens:
+            return  # Title unchanged (e.g. only `completed` flipped)
+        self.discard(task_id)
+        self._tokens_by_id[task_id] = tokens
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                insort(self._sorted_tokens, token)
+            postings.add(task_id)
+
+    def discard(self, task_id):
+        for token in self._tokens_by_id.pop(task_id, ()):
+            postings = self._postings[token]
+            postings.discard(task_id)
+            if not postings:
+                del self._postings[token]
+                del self._sorted_tokens[bisect_left(self._sorted_tokens, token)]
+
+    def _matching_prefix(self, prefix):
+        ids = set()
+        i = bisect_left(self._sorted_tokens, prefix)
+        while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(
+            prefix
+        ):
+            ids |= self._postings[self._sorted_tokens[i]]
+            i += 1
+        return ids
+
+    def search(self, query):
+        """TaskIds whose title has a word starting with each word of `query`.
+
+        Returns None for an empty query, meaning "no filter".
+        """
+        words = tokenize(query)
+        if not words:
+            return None
+        # Longest words first: they usually match the fewest titles
+        words.sort(key=len, reverse=True)
+        result = self._matching_prefix(words[0])
+        for word in words[1:]:
+            if not result:
+                break
+            result &= self._matching_prefix(word)
+        return result
+
+
+class TaskStore:
+    """Holds the tasks for one endpoint, keyed by `taskId`.
+
+    Insertion order is kept, so `tasks()` returns them in the order the
+    backend listed them (new tasks are appended at the end).
+    """
+
+    def __init__(self, endpoint=None):
+        self.endpoint = endpoint
+        self._tasks = {}
+        self.index = TaskIndex()
+        self.search_index = TitleSearchIndex()
+        self.synced_at = None  # time.monotonic() of the last full resync
+        # Delta sync state: the newest change we have seen, and whether the
+        # backend answered `?since=` with a delta the last time we asked.
+        self.sync_mark = None
+        self.delta_supported = True
+
+    # --- Reads ---
+    def tasks(self):
+        return list(self._tasks.values())
+
+    def get(self, task_id):
+        return self._tasks.get(task_id)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def needs_resync(self, endpoint, interval):
+        """True if never synced, synced for another endpoint, or too old."""
+        if self.synced_at is None or endpoint != self.endpoint:
+            return True
+        return time.monotonic() - self.synced_at >= interval
+
+    def can_delta_sync(self, endpoint):
+        return (
+            endpoint == self.endpoint
+            and self.sync_mark is not None
+            and self.delta_supported
+        )
+
+    # --- Full resync ---
+    def replace_all(self, tasks, endpoint=None, sync_mark=None):
+        if endpoint is not None and endpoint != self.endpoint:
+            self.endpoint = endpoint
+            self.delta_supported = True  # New backend, give it a chance
+        self._tasks = {t.get("taskId"): t for t in tasks if t.get("taskId")}
+        self.index.rebuild(self._tasks.values())
+        self.search_index.rebuild(self._tasks.values())
+        self.sync_mark = sync_mark or high_water_mark(tasks)
+        self.synced_at = time.monotonic()
+
+    def mark_stale(self, full=False):
+        """Forces a resync on the next read (a full one if `full` is set)."""
+        self.synced_at = None
+        if full:
+            self.sync_mark = None
+
+    # --- Delta sync ---
+    def apply_delta(self, changed, deleted_ids, sync_mark=None):
+        """Merges changed tasks and drops tombstoned ones."""
+        for task in changed:
+            self.upsert(task)
+        for task_id in deleted_ids:
+            self._drop(task_id)
+        self.sync_mark = sync_mark or high_water_mark(changed, self.sync_mark)
+        self.synced_at = time.monotonic()
+
+    # --- Local (optimistic) mutations ---
+    def upsert(self, task):
+        """Stores a task object as returned by the backend."""
+        if task.get("taskId"):
+            self._put(task)
+
+    def apply_update(self, task_id, changes):
+        """Merges `changes` into the stored task and returns a rollback snapshot."""
+        previous = self._tasks.get(task_id, _MISSING)
+        if previous is not _MISSING:
+            # Copy, so the snapshot (and any cached list) stays untouched
+            self._put({**previous, **changes})
+        return previous
+
+    def remove(self, task_id):
+        """Removes a task and returns a rollback snapshot."""
+        previous = self._tasks.get(task_id, _MISSING)
+        self._drop(task_id)
+        return previous
+
+    def rollback(self, task_id, snapshot):
+        """Undoes `apply_update` / `remove` using the snapshot they returned."""
+        if snapshot is _MISSING:
+            self._drop(task_id)
+        else:
+            # Note: a rolled-back delete goes to the end of the list
+            self._put(snapshot)
+
+    # Every write goes through these two, so the index never goes stale
+    def _put(self, task):
+        self._tasks[task["taskId"]] = task
+        self.index.add(task)
+        self.search_index.add(task)
+
+    def _drop(self, task_id):
+        self._tasks.pop(task_id, None)
+        self.index.discard(task_id)
+        self.search_index.discard(task_id)
@@ -1,11 +1,35 @@
+import os
+import uuid
 import streamlit as st
+import pandas as pd
 import requests
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import todo_async_client
+import todo_bulk
+import todo_client
+import todo_instrumentation
+import todo_transfer
+import todo_writebehind
+from todo_store import TaskStore, parse_due_date
 
 st.set_page_config(page_title="Cloud To-Do List", layout="wide")
 st.title("☁️ My Cloud To-Do List")
 st.caption("Powered by AWS Chalice & Streamlit")
 
+# --- Diagnostics (opt-in from the sidebar panel at the bottom) ---
+# When off, no collector is active and the request/render hooks are no-ops.
+if st.session_state.get("diagnostics_enabled"):
+    if "diagnostics" not in st.session_state:
+        st.session_state.diagnostics = todo_instrumentation.Collector()
+    todo_instrumentation.activate(st.session_state.diagnostics)
+    st.session_state.diagnostics.start_run("script")
+else:
+    todo_instrumentation.activate(None)
+
 
 # --- Configuration ---
 # User's actual deployed API endpoint that should preferably end with /tasks,
@@ -14,6 +38,38 @@ USER_DEPLOYED_API_URL_DEFAULT = (
     "https://tio2f44dq1.execute-api.us-east-1.amazonaws.com/api/tasks"  # Your default
 )
 
+# TODO_API_URL overrides the default above, e.g. to point the app at the local
+# stand-in backend (todo_standin_server.py) for benchmarks and load tests.
+USER_DEPLOYED_API_URL_DEFAULT = os.environ.get(
+    "TODO_API_URL", USER_DEPLOYED_API_URL_DEFAULT
+)
+
+# Hosts accepted besides AWS API Gateway URLs (a locally running backend).
+LOCAL_API_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+# Seconds a fetched task list is reused across reruns before it is revalidated
+# with the backend (via ETag / Last-Modified when the backend sends them).
+TASK_LIST_CACHE_TTL = 30
+
+# Seconds between full resyncs of the local task store. In between, the UI is
+# rendered from memory and only mutations talk to the backend.
+TASK_STORE_RESYNC_INTERVAL = 120
+
+# Seconds between redraws of the write-behind status while writes are queued.
+WRITE_QUEUE_POLL_INTERVAL = 1
+
+# Tasks shown per page in each section. Only the visible page gets widgets,
+# so rerun cost stays flat no matter how many tasks there are.
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100, 250]
+DEFAULT_PAGE_SIZE = 25
+
+# `sort` values offered for server-side listing ("-" means descending).
+SORT_OPTIONS = ["dueDate", "-dueDate", "title"]
+SORT_LABELS = {"dueDate": "Due date ↑", "-dueDate": "Due date ↓", "title": "Title"}
+
+# Local views over the task index (when not paging on the server).
+DUE_VIEWS = ["All", "Overdue", "Due this week"]
+
 # This variable will hold the string value from the text_input
 chalice_api_url_from_user = st.text_input(
     "Enter your Chalice API URL (base path or specific /tasks endpoint):",  # Corrected Label
@@ -34,12 +90,192 @@ else:
     pass
 
 
+# --- Shared HTTP Client ---
+# One pooled keep-alive session for the whole server process, so reruns (and
+# other browser sessions) reuse open connections instead of re-handshaking.
+@st.cache_resource
+def get_http_session():
+    return todo_client.create_session()
+
+
+def api_request(method, url, **kwargs):
+    """Sends a request through the shared session (with default timeouts)."""
+    return todo_client.api_request(get_http_session(), method, url, **kwargs)
+
+
+# --- Async Client (optional, needs httpx) ---
+# Used where a run needs several independent requests: they are sent
+# concurrently instead of one after the other.
+@st.cache_resource
+def get_async_runner():
+    if not todo_async_client.available():
+        return None
+    return todo_async_client.AsyncRunner()
+
+
+def rerun_requested():
+    """True once Streamlit has queued a newer run of this session's script.
+
+    Peeks at Streamlit internals; should they change, this returns False and
+    superseded reads are simply waited for instead of cancelled.
+    """
+    try:
+        return get_script_run_ctx().script_requests._state.name != "CONTINUE"
+    except Exception:
+        return False
+
+
+def run_concurrently(*coroutines, key):
+    """Runs reads on the async client for this session; see AsyncRunner.run.
+
+    A newer call with the same `key` from this session, or a newer rerun,
+    cancels the requests still in flight (Superseded is raised).
+    """
+    session_key = st.session_state.setdefault("async_session_key", uuid.uuid4().hex)
+    return get_async_runner().run(
+        *coroutines,
+        key=(session_key, key),
+        should_cancel=rerun_requested,
+        return_exceptions=True,
+    )
+
+
+# One task list cache for all browser sessions: a burst of reruns across
+# sessions costs one GET per endpoint, not one per session.
+@st.cache_resource
+def get_task_cache():
+    """Process-wide task list cache (see todo_client.SharedTaskListCache)."""
+    return todo_client.SharedTaskListCache(ttl=TASK_LIST_CACHE_TTL)
+
+
+def invalidate_task_cache():
+    """Called after any add/update/delete so the next read hits the backend."""
+    get_task_cache().invalidate(TASK_ENDPOINT)
+    # Server-side pages may have shifted; reload them from the first page
+    st.session_state.pop("task_cursors", None)
+
+
+def get_task_store():
+    """Per-session TaskStore the task list is rendered from."""
+    if "task_store" not in st.session_state:
+        st.session_state.task_store = TaskStore()
+    return st.session_state.task_store
+
+
+def get_row_overrides():
+    """Server-side paging: changes not yet reflected in the loaded pages.
+
+    taskId -> changes merged into the page copy of the task when it is drawn
+    (`{"deleted": True}` hides it). The pages are not in the TaskStore, so
+    this is where their optimistic updates go. Dropped when pages reload.
+    """
+    return st.session_state.setdefault("row_overrides", {})
+
+
+def override_row(task_id, changes):
+    """Records `changes` for a paged task; returns a rollback snapshot."""
+    if not st.session_state.get("server_side_paging"):
+        return None
+    overrides = get_row_overrides()
+    previous = overrides.get(task_id)
+    overrides[task_id] = {**(previous or {}), **changes}
+    return previous
+
+
+def restore_row(task_id, snapshot):
+    """Undoes `override_row` using the snapshot it returned."""
+    if snapshot is None:
+        get_row_overrides().pop(task_id, None)
+    else:
+        get_row_overrides()[task_id] = snapshot
+
+
+def with_row_overrides(tasks):
+    """Page copies of `tasks` with their overrides applied."""
+    overrides = get_row_overrides()
+    if not overrides:
+        return tasks
+    merged = []
+    for task in tasks:
+        changes = overrides.get(task.get("taskId"))
+        if changes:
+            task = {**task, **changes}
+        if not task.get("deleted"):
+            merged.append(task)
+    return merged
+
+
+def write_behind_enabled():
+    return bool(st.session_state.get("write_behind"))
+
+
+def get_write_queue():
+    """Per-session write-behind queue for the current endpoint."""
+    queue = st.session_state.get("write_queue")
+    if queue is None or queue.endpoint != TASK_ENDPOINT:
+        # A queue for a previous endpoint keeps flushing on its own
+        queue = st.session_state.write_queue = todo_writebehind.WriteBehindQueue(
+            get_http_session(),
+            TASK_ENDPOINT,
+            cache=get_task_cache(),
+            use_batch=backend_supports_batch(TASK_ENDPOINT),
+        )
+    return queue
+
+
+def sync_write_queue():
+    """Brings the store up to date with the write-behind queue.
+
+    Confirmed writes are replaced by the backend's copy, and writes still
+    queued are re-applied on top (a resync or page reload may have just
+    overwritten them).
+    """
+    queue = st.session_state.get("write_queue")
+    if queue is None:
+        return
+    store = get_task_store()
+    confirmed = queue.drain_confirmed()
+    for write, task in confirmed:
+        if task:
+            store.upsert(task)
+    for write in queue.pending():
+        if write.op == "delete":
+            store.remove(write.task_id)
+            override_row(write.task_id, {"deleted": True})
+        else:
+            if store.get(write.task_id) is not None:
+                store.apply_update(write.task_id, write.changes)
+            override_row(write.task_id, write.changes)
+    if confirmed:
+        # Server-side pages may have shifted
+        st.session_state.pop("task_cursors", None)
+
+
+def request_full_resync():
+    """Makes the next get_all_tasks() call reload the whole list."""
+    get_task_store().mark_stale(full=True)
+    invalidate_task_cache()
+
+
+def count_widgets(count):
+    """Adds to the widget count of the current run (diagnostics only)."""
+    collector = todo_instrumentation.current()
+    if collector is not None:
+        collector.add_widgets(count)
+
+
 # --- Helper Functions to Interact with Backend ---
+def api_url_is_valid():
+    """is_api_configured() without the sidebar warning."""
+    return bool(TASK_ENDPOINT) and (
+        "execute-api" in TASK_ENDPOINT  # Basic check for AWS API Gateway URL
+        or urlsplit(TASK_ENDPOINT).hostname in LOCAL_API_HOSTS
+    )
+
+
 def is_api_configured():
     """Checks if the API endpoint seems minimally configured."""
-    if (
-        not TASK_ENDPOINT or "execute-api" not in TASK_ENDPOINT
-    ):  # Basic check for AWS API Gateway URL
+    if not api_url_is_valid():
         st.sidebar.warning(
             "Please enter a valid Chalice API URL above to enable app functionality."
         )
@@ -50,11 +286,25 @@ def is_api_configured():
 def get_all_tasks():
     if not is_api_configured():
         return []
+    store = get_task_store()
+    if not store.needs_resync(TASK_ENDPOINT, TASK_STORE_RESYNC_INTERVAL):
+        return store.tasks()  # Served from memory, no request
     try:
-        response = requests.get(TASK_ENDPOINT)
-        response.raise_for_status()
-        # Assuming Chalice returns {'tasks': [...]}
-        return response.json().get("tasks", [])
+        if store.can_delta_sync(TASK_ENDPOINT):
+            # Only download what changed since the last sync
+            changes = todo_client.fetch_task_changes(
+                get_http_session(), TASK_ENDPOINT, store.sync_mark
+            )
+            if changes is None:
+                store.delta_supported = False  # Fall through to a full fetch
+            else:
+                store.apply_delta(changes.tasks, changes.deleted_ids, changes.sync_mark)
+                return store.tasks()
+        tasks = todo_client.fetch_task_list(
+            get_http_session(), TASK_ENDPOINT, cache=get_task_cache()
+        )
+        store.replace_all(tasks, endpoint=TASK_ENDPOINT)
+        return store.tasks()
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching tasks: {e}")
         return []
@@ -108,13 +358,12 @@ def update_existing_task(task_id, title=None, due_date=None, completed=None):
     if completed is not None:
         payload["completed"] = completed
 
-    # --- Add this for debugging ---
-    st.write("--- Streamlit: update_existing_task ---")
-    st.write(f"Task ID: {task_id}")
-    st.write(f"Payload being sent: {payload}")
-    st.write(f"Attempting to PUT to: {TASK_ENDPOINT}/{task_id}")
-    st.write("--- End Streamlit Debug ---")
-    # --- End debugging ---
+    # --- Debug info (kept in the diagnostics panel, only when enabled) ---
+    collector = todo_instrumentation.current()
+    if collector is not None:
+        collector.debug(
+            f"update_existing_task: PUT {TASK_ENDPOINT}/{task_id} payload={payload}"
+        )
 
     if not payload:  # No actual changes were passed other than potentially None values
         st.warning(
@@ -138,10 +387,24 @@ def update_existing_task(task_id, title=None, due_date=None, completed=None):
         st.warning("No changes detected to update.")
         return None  # Or just return the original task if no changes.
 
+    # Apply the change locally right away; it is rolled back below if the
+    # backend call fails.
+    store = get_task_store()
+    snapshot = store.apply_update(task_id, payload)
+    row_snapshot = override_row(task_id, payload)
+    if write_behind_enabled():
+        # Sent in the background; failures show up in the sidebar
+        get_write_queue().update(task_id, payload, snapshot)
+        # The sidebar poller reruns the app once it has been sent
+        st.session_state.write_queue_busy = True
+        return store.get(task_id) or {**payload, "taskId": task_id}
     try:
-        response = requests.put(f"{TASK_ENDPOINT}/{task_id}", json=payload)
+        response = api_request("PUT", f"{TASK_ENDPOINT}/{task_id}", json=payload)
         response.raise_for_status()
+        invalidate_task_cache()
         updated_task_data = response.json().get("task", {})
+        store.upsert(updated_task_data)  # Server's copy wins over our guess
+        override_row(task_id, updated_task_data)
         updated_title = updated_task_data.get("title", task_id)
         st.success(f"Task '{updated_title}' updated successfully!")
         return updated_task_data
@@ -158,9 +421,13 @@ def update_existing_task(task_id, title=None, due_date=None, completed=None):
                 if "response" in locals() and hasattr(response, "text")
                 else "No additional details."
             )
+        store.rollback(task_id, snapshot)
+        restore_row(task_id, row_snapshot)
         st.error(f"Error updating task: {e} - Details: {error_detail}")
         return None
     except Exception as e:
+        store.rollback(task_id, snapshot)
+        restore_row(task_id, row_snapshot)
         st.error(f"An unexpected error occurred while updating task: {e}")
         return None
 
@@ -171,29 +438,32 @@ def add_new_task(title, due_date):
         return None
     payload = {"title": title, "dueDate": due_date}
     try:
-        response = requests.post(TASK_ENDPOINT, json=payload)
-
-        # --- BEGIN DEBUGGING ---
-        st.write("--- Add Task Debug Info (Frontend) ---")
-        st.write(f"Request URL: POST {TASK_ENDPOINT}")
-        st.write(f"Request Payload: {payload}")
-        st.write(f"Response Status Code: {response.status_code}")
-        st.write(f"Response Headers: {response.headers}")
+        response = api_request("POST", TASK_ENDPOINT, json=payload)
+
+        # --- Debug info (kept in the diagnostics panel, only when enabled) ---
+        collector = todo_instrumentation.current()
+        if collector is not None:
+            collector.debug(f"add_new_task: POST {TASK_ENDPOINT} payload={payload}")
+            collector.debug(
+                f"add_new_task: status={response.status_code}"
+                f" headers={dict(response.headers)}"
+            )
         try:
             parsed_json_response = response.json()
-            st.write(f"Response Parsed JSON Type: {type(parsed_json_response)}")
-            st.write(f"Response Parsed JSON Content: {parsed_json_response}")
         except requests.exceptions.JSONDecodeError as json_err:
             st.error(f"Response Failed to parse as JSON: {json_err}")
-            st.write(f"Response Raw Text: {response.text}")
             st.error(
                 f"Error adding task: Backend response was not valid JSON. Raw text: {response.text}"
             )
             return None  # Exit early if not valid JSON
-        st.write("--- End Add Task Debug Info (Frontend) ---")
-        # --- END DEBUGGING ---
+        if collector is not None:
+            collector.debug(
+                f"add_new_task: response ({type(parsed_json_response).__name__})"
+                f" {parsed_json_response}"
+            )
 
         response.raise_for_status()  # Check for HTTP errors (4xx or 5xx)
+        invalidate_task_cache()
 
         # Use the parsed_json_response from the debugging block
         # This is the line that was likely causing the error if parsed_json_response is a list
@@ -201,6 +471,10 @@ def add_new_task(title, due_date):
             "task", {}
         )  # This line will error if parsed_json_response is a list
         added_title = added_task_data.get("title", title)
+        if added_task_data.get("taskId"):
+            get_task_store().upsert(added_task_data)
+        else:
+            get_task_store().mark_stale()  # Can't place it locally, resync
 
         st.success(f"Task '{added_title}' added successfully!")
         return added_task_data
@@ -238,10 +512,19 @@ def add_new_task(title, due_date):
 def delete_existing_task(task_id):
     if not is_api_configured():
         return None
+    # Remove locally first; restored below if the backend call fails
+    store = get_task_store()
+    snapshot = store.remove(task_id)
+    if write_behind_enabled():
+        override_row(task_id, {"deleted": True})
+        get_write_queue().delete(task_id, snapshot)
+        st.session_state.write_queue_busy = True
+        return True
     try:
         # TASK_ENDPOINT is like ".../tasks", so we append "/{task_id}"
-        response = requests.delete(f"{TASK_ENDPOINT}/{task_id}")
+        response = api_request("DELETE", f"{TASK_ENDPOINT}/{task_id}")
         response.raise_for_status()
+        invalidate_task_cache()
         # Chalice delete returns a message like {'message': "Task 'id' deleted successfully."}
         st.success(
             response.json().get("message", f"Task '{task_id}' deleted successfully!")
@@ -259,13 +542,540 @@ def delete_existing_task(task_id):
                 if "response" in locals() and hasattr(response, "text")
                 else "No additional details."
             )
+        store.rollback(task_id, snapshot)
         st.error(f"Error deleting task: {e} - Details: {error_detail}")
         return False
     except Exception as e:
+        store.rollback(task_id, snapshot)
         st.error(f"An unexpected error occurred while deleting task: {e}")
         return False
 
 
+@st.cache_data(ttl=600, show_spinner=False)
+def backend_supports_batch(endpoint):
+    """Whether `endpoint` has the optional /batch route (checked every 10 min)."""
+    return todo_client.supports_batch(get_http_session(), endpoint)
+
+
+BULK_ACTIONS = ["Mark complete", "Mark pending", "Reschedule", "Delete"]
+BULK_ACTION_DONE = {
+    "Mark complete": "marked complete",
+    "Mark pending": "marked pending",
+    "Reschedule": "rescheduled",
+    "Delete": "deleted",
+}
+
+
+def apply_bulk_action(task_ids, action, due_date=None):
+    """Applies `action` to all `task_ids` and updates the local store.
+
+    Uses the backend batch endpoint when available, otherwise concurrent
+    single-task calls. Returns a todo_bulk.BulkResult.
+    """
+    if action == "Delete":
+        operations = [todo_bulk.delete_op(t) for t in task_ids]
+    elif action == "Reschedule":
+        operations = [todo_bulk.update_op(t, {"dueDate": due_date}) for t in task_ids]
+    else:
+        completed = action == "Mark complete"
+        operations = [
+            todo_bulk.update_op(t, {"completed": completed}) for t in task_ids
+        ]
+
+    return run_operations(operations)
+
+
+def run_operations(operations):
+    """Sends todo_bulk operations and applies the successful ones locally."""
+    use_batch = backend_supports_batch(TASK_ENDPOINT)
+    runner = get_async_runner()
+    if runner is not None and not use_batch:
+        # Writes are never cancelled by a rerun: their outcome must be known
+        (result,) = runner.run(runner.client(TASK_ENDPOINT).run_bulk(operations))
+    else:
+        result = todo_bulk.run_bulk(
+            get_http_session(), TASK_ENDPOINT, operations, use_batch=use_batch
+        )
+
+    store = get_task_store()
+    for op, task in result.succeeded:
+        if op["op"] == "delete":
+            store.remove(op["taskId"])
+        else:
+            store.apply_update(op["taskId"], op["changes"])
+            store.upsert(task or {})  # Server's copy, when it sent one
+    if result.succeeded:
+        invalidate_task_cache()
+    return result
+
+
+# --- Import / Export ---
+EXPORT_MIME_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def import_uploaded_tasks(upload):
+    """Creates tasks from an uploaded CSV / NDJSON file, with a progress bar.
+
+    The report is kept in session_state for the rerun that follows. Tasks
+    created before a failure are kept too, so a retry doesn't duplicate them.
+    """
+    try:
+        fmt = todo_transfer.format_for_filename(upload.name)
+    except ValueError as e:
+        st.error(str(e))
+        return
+    progress = st.progress(0.0, text="Importing…")
+
+    def on_progress(report, fraction):
+        progress.progress(
+            fraction or 0.0,
+            text=f"{len(report.created)} created, {len(report.errors)} error(s)",
+        )
+
+    report = todo_transfer.import_tasks(
+        get_http_session(),
+        TASK_ENDPOINT,
+        upload,
+        fmt,
+        use_batch=backend_supports_batch(TASK_ENDPOINT),
+        on_progress=on_progress,
+    )
+    store = get_task_store()
+    for task in report.created:
+        store.upsert(task)
+    if report.created:
+        invalidate_task_cache()
+    st.session_state.import_report = (
+        len(report.created),
+        report.rows,
+        report.errors,
+        report.failure,
+    )
+    st.rerun()
+
+
+def prepare_export(fmt):
+    """Builds the export file for the download button (it wants the bytes).
+
+    Only runs on an explicit click, so ordinary reruns don't read every task
+    from the backend. Tasks are read page by page, into one BytesIO that is
+    kept (not copied) until it is downloaded or another format is picked.
+    """
+    try:
+        with st.spinner("Preparing export…"):
+            tasks = todo_transfer.iter_backend_tasks(get_http_session(), TASK_ENDPOINT)
+            data = todo_transfer.export_bytes(tasks, fmt)
+    except requests.exceptions.RequestException as e:
+        st.error(f"Export failed: {todo_client.describe_error(e)}")
+        return
+    except Exception as e:
+        st.error(f"An unexpected error occurred while exporting tasks: {e}")
+        return
+    st.session_state.prepared_export = (fmt, data)
+
+
+# --- List Rendering Helpers ---
+def page_bounds(total, key, has_more=False):
+    """(start, end, page, page count) of the page stored under `key`.
+
+    `has_more` means more items exist on the server than were loaded, so one
+    extra page is offered.
+    """
+    page_size = st.session_state.get("page_size", DEFAULT_PAGE_SIZE)
+    page_count = max(1, -(-total // page_size))  # Ceiling division
+    if has_more:
+        page_count += 1
+    page = min(st.session_state.get(key, 1), page_count)
+    start = min((page - 1) * page_size, total)
+    end = min(start + page_size, total)
+    return start, end, page, page_count
+
+
+def render_pager(total, key, has_more=False):
+    """Draws page controls for `total` items; returns the (start, end) slice."""
+    start, end, page, page_count = page_bounds(total, key, has_more)
+    if page_count == 1 and not has_more:
+        return 0, total
+    # Keep the stored page in range if the list shrank (e.g. after deletes)
+    if st.session_state.get(key, 1) > page_count:
+        st.session_state[key] = page_count
+    count_widgets(1)
+    # Fixed label: a label that changes with page_count would reset the widget
+    st.number_input("Page", min_value=1, max_value=page_count, key=key)
+    st.caption(
+        f"Showing {start + 1}–{end} of {total}{'+' if has_more else ''}"
+        f" (page {page} of {page_count}{'+' if has_more else ''})"
+    )
+    return start, end
+
+
+def task_due_date(task):
+    """Parsed due date, taken from the store index when the task is in it."""
+    record = get_task_store().index.get(task.get("taskId"))
+    if record is not None:
+        return record.due
+    return parse_due_date(task.get("dueDate"))
+
+
+def select_tasks(completed):
+    """One section's tasks from the store index.
+
+    Applies the sidebar view options and the search box.
+    """
+    store = get_task_store()
+    index = store.index
+    due_view = st.session_state.get("due_view", DUE_VIEWS[0])
+    today = date.today()
+    if due_view == "Overdue":
+        # Finished tasks aren't overdue
+        records = [] if completed else index.by_due(completed, end=today)
+    elif due_view == "Due this week":
+        records = index.by_due(completed, start=today, end=today + timedelta(days=7))
+    elif st.session_state.get("sort_by_due"):
+        records = index.by_due(completed)
+    else:
+        records = index.listed(completed)
+    matches = store.search_index.search(st.session_state.get("task_search", ""))
+    if matches is not None:
+        return [record.data for record in records if record.task_id in matches]
+    return [record.data for record in records]
+
+
+def get_task_cursor(status):
+    """Session TaskCursor for one section, rebuilt when the filters change."""
+    query = (
+        TASK_ENDPOINT,
+        status,
+        st.session_state.get("page_size", DEFAULT_PAGE_SIZE),
+        st.session_state.get("filter_due_before"),
+        st.session_state.get("filter_due_after"),
+        st.session_state.get("filter_sort", SORT_OPTIONS[0]),
+    )
+    cursors = st.session_state.setdefault("task_cursors", {})
+    cached = cursors.get(status)
+    if cached is None or cached[0] != query:
+        endpoint, _, page_size, due_before, due_after, sort = query
+        cursor = todo_client.TaskCursor(
+            endpoint,
+            page_size,
+            status=status,
+            due_before=due_before.strftime("%Y-%m-%d") if due_before else None,
+            due_after=due_after.strftime("%Y-%m-%d") if due_after else None,
+            sort=sort,
+        )
+        cached = cursors[status] = (query, cursor)
+        st.session_state.pop("row_overrides", None)  # The reload reflects them
+    return cached[1]
+
+
+def load_task_section(status, page_key):
+    """Server-side paging: loads `status` tasks up to the page being viewed.
+
+    Returns (tasks loaded so far, whether the server has more).
+    """
+    cursor = get_task_cursor(status)
+    page_size = st.session_state.get("page_size", DEFAULT_PAGE_SIZE)
+    try:
+        cursor.ensure(get_http_session(), st.session_state.get(page_key, 1) * page_size)
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error fetching {status} tasks: {e}")
+    except Exception as e:
+        st.error(f"An unexpected error occurred while fetching tasks: {e}")
+    return cursor.tasks, cursor.has_more
+
+
+def load_task_sections(page_keys):
+    """load_task_section() for several sections at once.
+
+    `page_keys` maps status -> page key. With the async client the sections
+    are fetched concurrently. Returns status -> (tasks, has_more).
+    """
+    runner = get_async_runner()
+    if runner is None:
+        return {
+            status: load_task_section(status, page_key)
+            for status, page_key in page_keys.items()
+        }
+    page_size = st.session_state.get("page_size", DEFAULT_PAGE_SIZE)
+    cursors = {status: get_task_cursor(status) for status in page_keys}
+    client = runner.client(TASK_ENDPOINT)
+    try:
+        outcomes = run_concurrently(
+            *(
+                client.ensure_cursor(
+                    cursors[status], st.session_state.get(page_key, 1) * page_size
+                )
+                for status, page_key in page_keys.items()
+            ),
+            key="task_sections",
+        )
+    except todo_async_client.Superseded:
+        outcomes = [None] * len(cursors)  # A newer run takes over
+    for status, outcome in zip(cursors, outcomes):
+        if isinstance(outcome, requests.exceptions.RequestException):
+            st.error(f"Error fetching {status} tasks: {outcome}")
+        elif isinstance(outcome, Exception):
+            st.error(f"An unexpected error occurred while fetching tasks: {outcome}")
+    return {
+        status: (cursor.tasks, cursor.has_more) for status, cursor in cursors.items()
+    }
+
+
+def render_task_table(page_tasks, key):
+    """Compact table mode: one st.data_editor for a whole page of tasks.
+
+    Edits are collected in the table and sent together on "Save changes",
+    through the same path as the bulk actions.
+    """
+    rows = [
+        {
+            "taskId": task.get("taskId"),
+            "Done": bool(task.get("completed", False)),
+            "Title": task.get("title", ""),
+            "Due": task_due_date(task),
+            "Delete": False,
+        }
+        for task in page_tasks
+    ]
+    # The editor keeps unsaved edits by row position, whatever the rows hold.
+    # A key per set of tasks makes it a new widget when the page shows other
+    # tasks (paging, search, sort), so edits are never saved to the wrong ones.
+    editor_key = f"{key}_{hash(tuple(row['taskId'] for row in rows))}"
+    count_widgets(2)
+    original = pd.DataFrame(rows, columns=["taskId", "Done", "Title", "Due", "Delete"])
+    edited = st.data_editor(
+        original,
+        key=editor_key,
+        hide_index=True,
+        use_container_width=True,
+        column_order=["Done", "Title", "Due", "Delete"],  # taskId stays hidden
+        column_config={
+            "Due": st.column_config.DateColumn("Due", format="YYYY-MM-DD"),
+            "Delete": st.column_config.CheckboxColumn("Delete 🗑️"),
+        },
+        disabled=["taskId"],
+    )
+    if not st.button("Save changes", key=f"{key}_save"):
+        return
+
+    operations = []
+    for before, after in zip(rows, edited.to_dict("records")):
+        task_id = before["taskId"]
+        if after["Delete"]:
+            operations.append(todo_bulk.delete_op(task_id))
+            continue
+        changes = {}
+        if after["Done"] != before["Done"]:
+            changes["completed"] = bool(after["Done"])
+        if after["Title"] != before["Title"]:
+            changes["title"] = after["Title"]
+        if after["Due"] != before["Due"] and not pd.isna(after["Due"]):
+            changes["dueDate"] = after["Due"].strftime("%Y-%m-%d")
+        if changes:
+            operations.append(todo_bulk.update_op(task_id, changes))
+    if not operations:
+        st.info("No changes to save.")
+        return
+
+    result = run_operations(operations)
+    for op, message in result.failed:
+        st.error(f"Task '{op['taskId']}': {message}")
+    if not result.failed:
+        del st.session_state[editor_key]  # Drop the applied edits from the widget
+        st.rerun()
+
+
+# --- Task Row (rendered as a fragment) ---
+def rerun_row():
+    """Reruns only the current fragment, or the whole app during a full run."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:  # Not inside a fragment rerun
+        st.rerun()
+
+
+@st.fragment
+def render_task_row(task, section):
+    """Draws one task and its inline editor.
+
+    This is a fragment: clicks inside the row rerun only this function, not
+    the whole script. Completing / un-completing a task redraws the row in
+    place (it moves to the other section on the next full run); deletes and
+    adds change the list itself and still rerun everything.
+    """
+    # Fragment reruns skip the top of the script, so (re)activate diagnostics
+    # here; they get their own run record.
+    collector = st.session_state.get("diagnostics")
+    if not st.session_state.get("diagnostics_enabled"):
+        collector = None
+    todo_instrumentation.activate(collector)
+    own_run = collector is not None and not collector.in_script_run()
+    if own_run:
+        collector.start_run("fragment")
+
+    task_id = task.get("taskId")
+    if st.session_state.get("server_side_paging"):
+        # Drawn from the loaded page (the store isn't synced in this mode),
+        # plus the changes made since it loaded
+        task = {**task, **get_row_overrides().get(task_id, {})}
+    else:
+        # On fragment reruns `task` is the copy from the last full run, the
+        # store holds the current one
+        task = get_task_store().get(task_id) or task
+    # Unique prefix for keys based on task ID
+    unique_key_prefix = f"{section}_{task_id}"
+    is_completed = bool(task.get("completed", False))
+
+    if is_completed:
+        col1, col2, col4 = st.columns([0.05, 0.65, 0.3])
+        col3 = None
+        count_widgets(2)
+    else:
+        col1, col2, col3, col4 = st.columns([0.05, 0.4, 0.25, 0.3])
+        count_widgets(3)
+
+    # --- Column 1: Checkbox ---
+    with col1:
+        is_checked_by_user = st.checkbox(
+            "", value=is_completed, key=f"{unique_key_prefix}_check"
+        )
+        if is_checked_by_user != is_completed:
+            # If (un)completing a task that was being edited, close the editor
+            if st.session_state.editing_task_id == task_id:
+                st.session_state.editing_task_id = None
+            if update_existing_task(task_id, completed=is_checked_by_user):
+                rerun_row()  # Redraw just this row
+
+    # --- Column 2: Title and Date ---
+    with col2:
+        if is_completed:
+            st.markdown(f"~~{task.get('title', 'N/A')}~~")
+            st.caption(f"Completed (Due: {task.get('dueDate', 'N/A')})")
+        else:
+            st.markdown(f"**{task.get('title', 'N/A')}**")
+            st.caption(f"Due: {task.get('dueDate', 'N/A')}")
+
+    # --- Column 3: Edit Button (pending tasks only) ---
+    if col3 is not None:
+        with col3:
+            # Edit button now just sets the session state flag
+            if st.button("Edit", key=f"{unique_key_prefix}_edit_action"):
+                previously_editing = st.session_state.editing_task_id
+                st.session_state.editing_task_id = task_id  # Set which task to edit
+                if previously_editing not in (None, task_id):
+                    st.rerun()  # Another row's editor is open, redraw all to close it
+                rerun_row()  # Rerun this row to display the editor
+
+    # --- Column 4: Delete Button ---
+    with col4:
+        if st.button("Delete 🗑️", key=f"{unique_key_prefix}_del", type="secondary"):
+            # If deleting a task that was being edited, close the editor
+            if st.session_state.editing_task_id == task_id:
+                st.session_state.editing_task_id = None
+            if delete_existing_task(task_id):
+                st.rerun()  # The list itself changed
+
+    # --- Conditionally Display Edit Form based on Session State ---
+    if not is_completed and st.session_state.editing_task_id == task_id:
+        # Use an expander or just draw the form directly
+        count_widgets(4)
+        with st.expander("✏️ Edit Task Details", expanded=True):
+            # Use st.form for the edit inputs and save button
+            with st.form(key=f"{unique_key_prefix}_edit_form"):
+                edit_title = st.text_input(
+                    "New Title",
+                    value=task.get("title"),  # Pre-fill with current title
+                    key=f"{unique_key_prefix}_edit_title_input",
+                )
+                # Parsed once when the task entered the store
+                current_due_date_obj = task_due_date(task) or date.today()
+                edit_due_date = st.date_input(
+                    "New Due Date",
+                    value=current_due_date_obj,  # Pre-fill with current date
+                    key=f"{unique_key_prefix}_edit_date_input",
+                )
+
+                # The button inside the form triggers the form submission
+                save_submitted = st.form_submit_button("Save Changes")
+
+                if save_submitted:
+                    if collector is not None:
+                        collector.debug(f"Save Changes submitted for task {task_id}")
+                    success = update_existing_task(
+                        task_id,
+                        title=edit_title,  # Use current value from input
+                        due_date=edit_due_date.strftime(
+                            "%Y-%m-%d"
+                        ),  # Use current value from input
+                    )
+                    if (
+                        success
+                    ):  # update_existing_task returns the updated task dict on success, None on failure
+                        st.session_state.editing_task_id = None  # Close the editor
+                        rerun_row()  # Redraw this row only
+                    # Error messages are handled within update_existing_task
+
+            # Add a separate "Cancel" button outside the form
+            if st.button("Cancel Edit", key=f"{unique_key_prefix}_cancel_edit"):
+                st.session_state.editing_task_id = None  # Clear the editing flag
+                rerun_row()  # Rerun this row to hide the editor
+
+    st.markdown("---")  # Separator after each task item / editor
+    if own_run:
+        collector.finish_run()
+
+
+# --- Write-behind Status ---
+def describe_write(write):
+    task = get_task_store().get(write.task_id) or write.snapshot
+    title = (
+        task.get("title", write.task_id) if isinstance(task, dict) else write.task_id
+    )
+    if write.op == "delete":
+        return f"Delete '{title}'"
+    return f"Update '{title}': " + ", ".join(
+        f"{k}={v!r}" for k, v in write.changes.items()
+    )
+
+
+def render_write_queue_status(queue):
+    pending = queue.pending()
+    if pending:
+        retrying = sum(1 for w in pending if w.attempts)
+        st.caption(
+            f"⏳ {len(pending)} write(s) pending"
+            + (f", {retrying} retrying" if retrying else "")
+        )
+    for write in queue.failed():
+        st.error(f"{describe_write(write)} failed: {write.error}")
+        col1, col2 = st.columns(2)
+        if col1.button("Retry", key=f"write_retry_{write.task_id}"):
+            queue.retry(write.task_id)
+            st.rerun()
+        if col2.button("Discard", key=f"write_discard_{write.task_id}"):
+            discarded = queue.discard(write.task_id)
+            if discarded is not None:
+                get_task_store().rollback(write.task_id, discarded.snapshot)
+                restore_row(write.task_id, None)
+            st.rerun()
+
+
+@st.fragment(run_every=WRITE_QUEUE_POLL_INTERVAL)
+def render_write_queue_live(queue):
+    """Polls the status while background saves are on (the worker can't rerun us).
+
+    Writes are queued from row fragment reruns, which don't redraw the
+    sidebar, so this keeps polling even while the queue is idle. Once writes
+    have settled it reruns the app, to fold them in and show any failures.
+    """
+    busy = queue.has_pending()
+    if not busy and st.session_state.get("write_queue_busy"):
+        st.session_state.write_queue_busy = False
+        st.rerun()
+    st.session_state.write_queue_busy = busy
+    render_write_queue_status(queue)
+
+
 # --- Streamlit UI Layout ---
 # --- Streamlit UI Layout ---
 
@@ -300,6 +1110,115 @@ with st.sidebar:
             else:
                 st.warning("Please provide both title and due date.")
 
+    with st.expander("📦 Import / export"):
+        # Report from the previous run (the import itself ends in a rerun)
+        import_report = st.session_state.pop("import_report", None)
+        if import_report:
+            created_count, row_count, import_errors, import_failure = import_report
+            st.success(f"{created_count} of {row_count} row(s) imported.")
+            if import_failure:
+                st.error(f"Import stopped: {import_failure}")
+            if import_errors:
+                st.error(f"{len(import_errors)} row(s) failed:")
+                st.dataframe(
+                    pd.DataFrame(import_errors, columns=["row", "error"]),
+                    hide_index=True,
+                    use_container_width=True,
+                )
+        upload = st.file_uploader(
+            "Import tasks",
+            type=["csv", "ndjson", "jsonl", "json"],
+            key="import_file",
+            help="Needs `title` and `dueDate` (YYYY-MM-DD) columns / fields.",
+        )
+        if upload is not None and st.button("Import", key="import_button"):
+            if is_api_configured():
+                import_uploaded_tasks(upload)
+            else:
+                st.error("API URL not configured. Cannot import tasks.")
+        export_format = st.radio(
+            "Export format", todo_transfer.FORMATS, horizontal=True, key="export_format"
+        )
+        if is_api_configured():
+            if st.button("Prepare export", key="export_prepare_button"):
+                prepare_export(export_format)
+            prepared = st.session_state.get("prepared_export")
+            if prepared is not None and prepared[0] != export_format:
+                del st.session_state.prepared_export  # Made for the other format
+            elif prepared is not None:
+                if st.download_button(
+                    f"Download tasks.{export_format}",
+                    data=prepared[1],
+                    file_name=f"tasks.{export_format}",
+                    mime=EXPORT_MIME_TYPES[export_format],
+                    key="export_button",
+                ):
+                    del st.session_state.prepared_export  # Downloaded
+
+    st.header("👁️ View")
+    view_mode = st.radio(
+        "Layout",
+        ["Cards", "Table"],
+        horizontal=True,
+        key="view_mode",
+        help="Table mode shows a whole page as one editable grid.",
+    )
+    st.selectbox(
+        "Tasks per page",
+        PAGE_SIZE_OPTIONS,
+        index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE),
+        key="page_size",
+    )
+
+    server_side_paging = st.checkbox(
+        "Filter & page on the server",
+        key="server_side_paging",
+        help=(
+            "Sends status/date/sort/limit query parameters to the backend and "
+            "only downloads the pages you view."
+        ),
+    )
+    if not server_side_paging:
+        st.selectbox(
+            "Show",
+            DUE_VIEWS,
+            key="due_view",
+            help="'Due this week' means due today or within the next 6 days.",
+        )
+        st.checkbox("Sort by due date", key="sort_by_due")
+    else:
+        st.date_input("Due after", value=None, key="filter_due_after")
+        st.date_input("Due before", value=None, key="filter_due_before")
+        st.selectbox(
+            "Sort by",
+            SORT_OPTIONS,
+            format_func=SORT_LABELS.get,
+            key="filter_sort",
+        )
+
+    # The list is normally rendered from memory; this forces a full reload
+    if st.button("🔄 Refresh tasks", key="refresh_tasks_button"):
+        request_full_resync()
+
+    st.header("💾 Saving")
+    st.checkbox(
+        "Save in the background",
+        key="write_behind",
+        help=(
+            "Checkbox and edit saves return immediately and are sent by a "
+            "background worker; repeated changes to a task are merged into "
+            "one request."
+        ),
+    )
+    write_queue = st.session_state.get("write_queue")
+    if write_behind_enabled() and api_url_is_valid():
+        write_queue = get_write_queue()  # Ready before the first row click
+    if write_queue is not None:
+        if write_behind_enabled() or write_queue.has_pending():
+            render_write_queue_live(write_queue)
+        else:
+            render_write_queue_status(write_queue)
+
 
 # --- Main area for displaying tasks ---
 if not is_api_configured():
@@ -307,119 +1226,114 @@ if not is_api_configured():
         "Please enter your Chalice API URL in the text input above to load and manage tasks."
     )
 else:
-    tasks = get_all_tasks()
+    if st.session_state.get("server_side_paging"):
+        # Only the pages being viewed are downloaded, per section
+        sections = load_task_sections(
+            {"pending": "pending_page", "completed": "completed_page"}
+        )
+        sync_write_queue()  # After loading: queued writes show on the pages
+        pending_tasks, pending_has_more = sections["pending"]
+        completed_tasks, completed_has_more = sections["completed"]
+        pending_tasks = with_row_overrides(pending_tasks)
+        completed_tasks = with_row_overrides(completed_tasks)
+        tasks = pending_tasks + completed_tasks
+    else:
+        tasks = get_all_tasks()
+        sync_write_queue()  # Before selecting: queued writes show as applied
+        # Split, filtered and ordered by the store's index, not by rescanning
+        pending_tasks = select_tasks(completed=False)
+        completed_tasks = select_tasks(completed=True)
+        pending_has_more = completed_has_more = False
 
     if not tasks:
         st.info("No tasks yet, or failed to load. Add one from the sidebar!")
     else:
         st.subheader("Your Tasks:")
+        if not st.session_state.get("server_side_paging"):
+            # Read by select_tasks() above, from the search index
+            st.text_input(
+                "🔍 Search titles",
+                key="task_search",
+                placeholder="Type words or word beginnings…",
+            )
 
-        pending_tasks = [t for t in tasks if not t.get("completed", False)]
-        completed_tasks = [t for t in tasks if t.get("completed", False)]
+        # --- Bulk Actions ---
+        with st.expander("🗂️ Bulk actions"):
+            # Report from the previous run (the action itself ends in a rerun)
+            bulk_report = st.session_state.pop("bulk_report", None)
+            if bulk_report:
+                done_action, ok_count, failures = bulk_report
+                if ok_count:
+                    st.success(f"{ok_count} task(s) {BULK_ACTION_DONE[done_action]}.")
+                for title, message in failures:
+                    st.error(f"'{title}': {message}")
+
+            # Options are the tasks on the visible pages, plus the ones already
+            # selected (kept across page changes): never the whole list
+            pending_start, pending_end, _, _ = page_bounds(
+                len(pending_tasks), "pending_page", pending_has_more
+            )
+            completed_start, completed_end, _, _ = page_bounds(
+                len(completed_tasks), "completed_page", completed_has_more
+            )
+            titles_by_id = {
+                t.get("taskId"): t.get("title", "N/A")
+                for t in pending_tasks[pending_start:pending_end]
+                + completed_tasks[completed_start:completed_end]
+            }
+            known_titles = st.session_state.get("bulk_titles", {})
+            for task_id in st.session_state.get("bulk_selected_ids", []):
+                titles_by_id.setdefault(task_id, known_titles.get(task_id, task_id))
+            st.session_state.bulk_titles = titles_by_id
+            selected_ids = st.multiselect(
+                "Tasks",
+                options=list(titles_by_id),
+                format_func=lambda task_id: titles_by_id.get(task_id, task_id),
+                key="bulk_selected_ids",
+            )
+            bulk_action = st.selectbox("Action", BULK_ACTIONS, key="bulk_action")
+            bulk_due_date = None
+            if bulk_action == "Reschedule":
+                bulk_due_date = st.date_input(
+                    "New Due Date", value=datetime.today(), key="bulk_due_date"
+                )
+            if st.button(
+                f"Apply to {len(selected_ids)} task(s)",
+                key="bulk_apply_button",
+                disabled=not selected_ids,
+            ):
+                result = apply_bulk_action(
+                    selected_ids,
+                    bulk_action,
+                    due_date=(
+                        bulk_due_date.strftime("%Y-%m-%d") if bulk_due_date else None
+                    ),
+                )
+                if st.session_state.editing_task_id in selected_ids:
+                    st.session_state.editing_task_id = None
+                st.session_state.bulk_report = (
+                    bulk_action,
+                    len(result.succeeded),
+                    [
+                        (titles_by_id.get(op["taskId"], op["taskId"]), message)
+                        for op, message in result.failed
+                    ],
+                )
+                # Selected tasks may be gone now; start the next selection fresh
+                del st.session_state["bulk_selected_ids"]
+                st.rerun()  # One rerun for the whole selection
 
         if pending_tasks:
             st.markdown("---")
             st.markdown("### ⏳ Pending")
-            for task in pending_tasks:
-                task_id = task.get("taskId")
-                # Unique prefix for keys based on task ID
-                unique_key_prefix = f"pending_{task_id}"
-
-                col1, col2, col3, col4 = st.columns([0.05, 0.4, 0.25, 0.3])
-
-                # --- Column 1: Checkbox ---
-                with col1:
-                    is_checked_by_user = st.checkbox(
-                        "", value=False, key=f"{unique_key_prefix}_check"
-                    )
-                    if is_checked_by_user:
-                        # If completing a task that was being edited, close the editor
-                        if st.session_state.editing_task_id == task_id:
-                            st.session_state.editing_task_id = None
-                        update_existing_task(task_id, completed=True)
-                        st.rerun()
-
-                # --- Column 2: Title and Date ---
-                with col2:
-                    st.markdown(f"**{task.get('title', 'N/A')}**")
-                    st.caption(f"Due: {task.get('dueDate', 'N/A')}")
-
-                # --- Column 3: Edit Button ---
-                with col3:
-                    # Edit button now just sets the session state flag
-                    if st.button("Edit", key=f"{unique_key_prefix}_edit_action"):
-                        st.session_state.editing_task_id = (
-                            task_id  # Set which task to edit
-                        )
-                        st.rerun()  # Rerun to display the editor
-
-                # --- Column 4: Delete Button ---
-                with col4:
-                    if st.button(
-                        "Delete 🗑️", key=f"{unique_key_prefix}_del", type="secondary"
-                    ):
-                        # If deleting a task that was being edited, close the editor
-                        if st.session_state.editing_task_id == task_id:
-                            st.session_state.editing_task_id = None
-                        if delete_existing_task(task_id):
-                            st.rerun()
-
-                # --- Conditionally Display Edit Form based on Session State ---
-                if st.session_state.editing_task_id == task_id:
-                    # Use an expander or just draw the form directly
-                    with st.expander("✏️ Edit Task Details", expanded=True):
-                        # Use st.form for the edit inputs and save button
-                        with st.form(key=f"{unique_key_prefix}_edit_form"):
-                            edit_title = st.text_input(
-                                "New Title",
-                                value=task.get("title"),  # Pre-fill with current title
-                                key=f"{unique_key_prefix}_edit_title_input",
-                            )
-                            current_due_date_str = task.get("dueDate")
-                            current_due_date_obj = (
-                                datetime.strptime(current_due_date_str, "%Y-%m-%d")
-                                if current_due_date_str
-                                else datetime.today()
-                            )
-                            edit_due_date = st.date_input(
-                                "New Due Date",
-                                value=current_due_date_obj,  # Pre-fill with current date
-                                key=f"{unique_key_prefix}_edit_date_input",
-                            )
-
-                            # The button inside the form triggers the form submission
-                            save_submitted = st.form_submit_button("Save Changes")
-
-                            if save_submitted:
-                                st.write(
-                                    f"--- Save Changes Submitted for task {task_id}! ---"
-                                )  # Debug
-                                success = update_existing_task(
-                                    task_id,
-                                    title=edit_title,  # Use current value from input
-                                    due_date=edit_due_date.strftime(
-                                        "%Y-%m-%d"
-                                    ),  # Use current value from input
-                                )
-                                if (
-                                    success
-                                ):  # update_existing_task returns the updated task dict on success, None on failure
-                                    st.session_state.editing_task_id = (
-                                        None  # Close the editor
-                                    )
-                                    st.rerun()  # Refresh list
-                                # Error messages are handled within update_existing_task
-
-                        # Add a separate "Cancel" button outside the form
-                        if st.button(
-                            "Cancel Edit", key=f"{unique_key_prefix}_cancel_edit"
-                        ):
-                            st.session_state.editing_task_id = (
-                                None  # Clear the editing flag
-                            )
-                            st.rerun()  # Rerun to hide the editor
-
-                st.markdown("---")  # Separator after each task item / editor
+            start, end = render_pager(
+                len(pending_tasks), key="pending_page", has_more=pending_has_more
+            )
+            if view_mode == "Table":
+                render_task_table(pending_tasks[start:end], key="pending_table")
+            else:
+                for task in pending_tasks[start:end]:
+                    render_task_row(task, "pending")
 
         else:
             # Only show this if the API is configured but no tasks are pending
@@ -431,36 +1345,80 @@ else:
         if completed_tasks:
             st.markdown("---")
             st.markdown("### ✅ Completed")
-            for task in completed_tasks:
-                # ... (display completed tasks - no edit needed here typically) ...
-                task_id = task.get("taskId")
-                unique_key_prefix = f"completed_{task_id}"
-
-                col1, col2, col3 = st.columns([0.05, 0.65, 0.3])
-                with col1:
-                    is_still_checked = st.checkbox(
-                        "", value=True, key=f"{unique_key_prefix}_check"
-                    )
-                    if not is_still_checked:
-                        # If unchecking a task that was being edited (unlikely but possible), close editor
-                        if st.session_state.editing_task_id == task_id:
-                            st.session_state.editing_task_id = None
-                        update_existing_task(task_id, completed=False)
-                        st.rerun()
-                with col2:
-                    st.markdown(f"~~{task.get('title', 'N/A')}~~")
-                    st.caption(f"Completed (Due: {task.get('dueDate', 'N/A')})")
-                with col3:
-                    if st.button(
-                        "Delete 🗑️", key=f"{unique_key_prefix}_del", type="secondary"
-                    ):
-                        # If deleting a task that was being edited (unlikely but possible), close editor
-                        if st.session_state.editing_task_id == task_id:
-                            st.session_state.editing_task_id = None
-                        if delete_existing_task(task_id):
-                            st.rerun()
-                st.markdown("---")
+            start, end = render_pager(
+                len(completed_tasks), key="completed_page", has_more=completed_has_more
+            )
+            if view_mode == "Table":
+                render_task_table(completed_tasks[start:end], key="completed_table")
+            else:
+                for task in completed_tasks[start:end]:
+                    render_task_row(task, "completed")
 
         # If tasks list is empty overall (and API was configured)
         elif not tasks and is_api_configured():
             st.info("No tasks found. Add one from the sidebar!")
+
+
+# --- Diagnostics Panel ---
+def render_diagnostics_panel(collector):
+    runs = list(collector.runs)
+    if runs:
+        last = runs[-1]
+        st.caption(f"Last {last.kind} run")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Total", f"{last.total_seconds * 1000:.0f} ms")
+        col2.metric("Fetch", f"{last.fetch_seconds * 1000:.0f} ms")
+        col3.metric("Render", f"{last.render_seconds * 1000:.0f} ms")
+        st.caption(
+            f"{last.request_count} request(s), {last.widget_count} task-list widget(s)"
+        )
+        st.dataframe(
+            pd.DataFrame([r.as_dict() for r in runs[-20:]]),
+            hide_index=True,
+            use_container_width=True,
+        )
+    cache_stats = get_task_cache().stats
+    if cache_stats:
+        st.caption(
+            "Shared list cache: "
+            + ", ".join(
+                f"{name} {count}" for name, count in sorted(cache_stats.items())
+            )
+        )
+    routes = collector.route_summary()
+    if routes:
+        st.caption("Requests by route")
+        st.dataframe(pd.DataFrame(routes), hide_index=True, use_container_width=True)
+    if collector.debug_lines:
+        with st.expander("Debug log"):
+            st.code("\n".join(collector.debug_lines), language=None)
+    st.download_button(
+        "Export JSON",
+        collector.to_json(),
+        file_name="todo_diagnostics.json",
+        mime="application/json",
+    )
+    st.download_button(
+        "Export Prometheus text",
+        collector.to_prometheus(),
+        file_name="todo_diagnostics.prom",
+        mime="text/plain",
+    )
+    if st.button("Clear diagnostics", key="diagnostics_clear"):
+        collector.clear()
+
+
+with st.sidebar:
+    st.header("🩺 Diagnostics")
+    diagnostics_enabled = st.checkbox(
+        "Record request & render timings",
+        key="diagnostics_enabled",
+        help="Times every backend call and script run for this session.",
+    )
+    if diagnostics_enabled and "diagnostics" in st.session_state:
+        render_diagnostics_panel(st.session_state.diagnostics)
+
+# Closes this run's record (runs cut short by st.rerun() are closed when the
+# next one starts)
+if todo_instrumentation.current() is not None:
+    todo_instrumentation.current().finish_run()
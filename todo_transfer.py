@@ -0,0 +1,312 @@
+"""Bulk import and export of tasks as CSV or NDJSON, one row at a time.
+
+Import reads the file row by row, validates `title` / `dueDate`, and creates
+the valid rows in chunks through todo_bulk (the batch endpoint when there is
+one, otherwise concurrent POSTs), rate-limited so a migration of thousands of
+tasks doesn't trip API Gateway throttling. Invalid or rejected rows end up in
+a per-row error report instead of aborting the import.
+
+Export writes tasks one row at a time to a file object or as an iterator of
+text chunks, reading a backend page by page. Only `export_bytes`, for
+st.download_button (which wants the whole file), holds the full result.
+
+Both also work from the command line:
+
+    python todo_transfer.py export --url http://127.0.0.1:8000/api/tasks > tasks.csv
+    python todo_transfer.py import tasks.ndjson --url ... --rate 20
+"""
+
+import argparse
+import codecs
+import csv
+import io
+import json
+import sys
+
+import todo_bulk
+import todo_client
+from todo_store import parse_due_date
+
+FORMATS = ("csv", "ndjson")
+
+# Columns written by export (import only needs title and dueDate; the other
+# columns are ignored, so an export can be imported again).
+EXPORT_FIELDS = ("taskId", "title", "dueDate", "completed")
+
+# Rows validated and sent per round; progress is reported after each.
+IMPORT_CHUNK_ROWS = 200
+
+# Create requests per second (a batch request counts as one).
+DEFAULT_RATE_LIMIT = 20
+
+# Tasks per page when exporting straight from a backend that pages.
+EXPORT_PAGE_SIZE = 500
+
+
+def format_for_filename(name):
+    """'tasks.csv' -> 'csv'; .ndjson / .jsonl / .json -> 'ndjson'."""
+    extension = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+    if extension == "csv":
+        return "csv"
+    if extension in ("ndjson", "jsonl", "json"):
+        return "ndjson"
+    raise ValueError(f"Unsupported file type '.{extension}' (use CSV or NDJSON).")
+
+
+# --- Import ---
+class ImportReport:
+    """Outcome of an import.
+
+    `created` holds the task objects the backend returned; `errors` holds
+    (row number, message) pairs. Rows are numbered from 1: for CSV the first
+    row after the header, for NDJSON the line number. `failure` is set when
+    the import stopped early; what was created before that is still listed.
+    """
+
+    __slots__ = ("rows", "created", "errors", "failure")
+
+    def __init__(self):
+        self.rows = 0
+        self.created = []
+        self.errors = []
+        self.failure = None
+
+
+def _decoded_lines(binary_file):
+    # Line by line, so a bad byte only stops reading at its own line
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    for line in binary_file:
+        yield decoder.decode(line)
+
+
+def iter_rows(binary_file, fmt):
+    """Yields (row number, row dict or error message) from an upload.
+
+    A row that can't be parsed at all yields its message instead of a dict.
+    If the rest of the file can't be read (not UTF-8, broken CSV), that is
+    yielded as the next row's message and reading stops.
+    """
+    lines = _decoded_lines(binary_file)
+    number = 0
+    try:
+        if fmt == "csv":
+            for number, row in enumerate(csv.DictReader(lines), start=1):
+                yield number, row
+        else:
+            for number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield number, f"Invalid JSON: {e}"
+                    continue
+                yield number, row if isinstance(row, dict) else "Not a JSON object"
+    except (UnicodeDecodeError, csv.Error) as e:
+        yield number + 1, f"Can't read the file from here on: {e}"
+
+
+def validate_row(row):
+    """Returns (title, dueDate) for a valid row, or raises ValueError."""
+    title = row.get("title")
+    title = title.strip() if isinstance(title, str) else ""
+    if not title:
+        raise ValueError("Missing title.")
+    raw_due = row.get("dueDate")
+    due = parse_due_date(raw_due.strip() if isinstance(raw_due, str) else None)
+    if due is None:
+        if not raw_due:
+            raise ValueError("Missing dueDate.")
+        raise ValueError(f"Invalid dueDate '{raw_due}' (expected YYYY-MM-DD).")
+    return title, due.isoformat()
+
+
+def import_tasks(
+    session,
+    endpoint,
+    binary_file,
+    fmt,
+    use_batch=False,
+    rate_limit=DEFAULT_RATE_LIMIT,
+    chunk_rows=IMPORT_CHUNK_ROWS,
+    on_progress=None,
+):
+    """Creates a task for every valid row of `binary_file`.
+
+    `on_progress(report, fraction)` is called after each chunk; `fraction`
+    is the share of the file read so far (None if the size is unknown).
+    Always returns the report: tasks already created must not be lost (or
+    created again by a retry) because a later chunk failed.
+    """
+    report = ImportReport()
+    total_bytes = _size(binary_file)
+    operations, row_numbers = [], []
+
+    def send():
+        result = todo_bulk.run_bulk(
+            session, endpoint, operations, use_batch=use_batch, rate_limit=rate_limit
+        )
+        row_of = {id(op): number for op, number in zip(operations, row_numbers)}
+        report.created.extend(task for _, task in result.succeeded if task)
+        report.errors.extend((row_of[id(op)], message) for op, message in result.failed)
+        operations.clear()
+        row_numbers.clear()
+        if on_progress is not None:
+            fraction = None
+            if total_bytes:
+                fraction = min(1.0, binary_file.tell() / total_bytes)
+            on_progress(report, fraction)
+
+    try:
+        for number, row in iter_rows(binary_file, fmt):
+            report.rows += 1
+            try:
+                if not isinstance(row, dict):
+                    raise ValueError(row)
+                title, due_date = validate_row(row)
+            except ValueError as e:
+                report.errors.append((number, str(e)))
+                continue
+            operations.append(todo_bulk.create_op(title, due_date))
+            row_numbers.append(number)
+            if len(operations) >= chunk_rows:
+                send()
+        send()
+    except Exception as e:
+        report.failure = str(e) or type(e).__name__
+        report.errors.extend((number, "Not sent.") for number in row_numbers)
+    report.errors.sort()
+    return report
+
+
+def _size(binary_file):
+    try:
+        position = binary_file.tell()
+        size = binary_file.seek(0, io.SEEK_END)
+        binary_file.seek(position)
+        return size - position
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+# --- Export ---
+def _export_value(task, field):
+    value = task.get(field, "")
+    if field == "completed":
+        return "true" if value else "false"
+    return value
+
+
+def iter_export(tasks, fmt):
+    """Yields the export of `tasks` (any iterable) as text chunks, row by row."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        for task in tasks:
+            writer.writerow([_export_value(task, f) for f in EXPORT_FIELDS])
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for task in tasks:
+            row = {f: task.get(f) for f in EXPORT_FIELDS if f in task}
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+def write_export(tasks, fmt, text_file):
+    """Writes the export of `tasks` to `text_file`; returns the task count."""
+    count = 0
+
+    def counted():
+        nonlocal count
+        for task in tasks:
+            count += 1
+            yield task
+
+    for chunk in iter_export(counted(), fmt):
+        text_file.write(chunk)
+    return count
+
+
+def export_bytes(tasks, fmt):
+    """The export as one UTF-8 BytesIO, for APIs that take a whole file.
+
+    Chunks are encoded straight into the buffer, so there is no row list or
+    intermediate string of the whole document next to it.
+    """
+    buffer = io.BytesIO()
+    for chunk in iter_export(tasks, fmt):
+        buffer.write(chunk.encode("utf-8"))
+    buffer.seek(0)
+    return buffer
+
+
+def iter_backend_tasks(session, endpoint, page_size=EXPORT_PAGE_SIZE):
+    """Yields every task of the backend, a page at a time when it pages."""
+    params = todo_client.build_task_query(limit=page_size)
+    while True:
+        page, next_cursor = todo_client.fetch_task_page(session, endpoint, params)
+        yield from page
+        if not page or not next_cursor:
+            return
+        params = dict(params, cursor=next_cursor)
+
+
+# --- Command Line ---
+def main():
+    parser = argparse.ArgumentParser(description="Import or export to-do tasks.")
+    parser.add_argument("--url", required=True, help="Backend /tasks URL")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Write all tasks to stdout")
+    export.add_argument("--format", choices=FORMATS, default="csv")
+
+    import_ = commands.add_parser("import", help="Create tasks from a file")
+    import_.add_argument("file")
+    import_.add_argument("--format", choices=FORMATS, help="Default: by extension")
+    import_.add_argument(
+        "--rate", type=float, default=DEFAULT_RATE_LIMIT, help="Requests per second"
+    )
+    import_.add_argument(
+        "--no-batch", action="store_true", help="Don't use the batch endpoint"
+    )
+    args = parser.parse_args()
+
+    session = todo_client.create_session()
+    if args.command == "export":
+        count = write_export(
+            iter_backend_tasks(session, args.url), args.format, sys.stdout
+        )
+        print(f"Exported {count} task(s).", file=sys.stderr)
+        return
+
+    fmt = args.format or format_for_filename(args.file)
+    use_batch = not args.no_batch and todo_client.supports_batch(session, args.url)
+
+    def progress(report, fraction):
+        done = f"{fraction:.0%}" if fraction is not None else f"{report.rows} rows"
+        print(f"... {done}, {len(report.created)} created", file=sys.stderr)
+
+    with open(args.file, "rb") as f:
+        report = import_tasks(
+            session,
+            args.url,
+            f,
+            fmt,
+            use_batch=use_batch,
+            rate_limit=args.rate,
+            on_progress=progress,
+        )
+    print(f"{len(report.created)} of {report.rows} row(s) imported.", file=sys.stderr)
+    if report.failure:
+        print(f"Import stopped: {report.failure}", file=sys.stderr)
+    for number, message in report.errors:
+        print(f"row {number}: {message}", file=sys.stderr)
+    sys.exit(1 if report.errors or report.failure else 0)
+
+
+if __name__ == "__main__":
+    main()
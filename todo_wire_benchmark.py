@@ -0,0 +1,142 @@
+"""Bytes on the wire and client decode time per task list representation.
+
+Fetches the full task list from an in-process todo_standin_server once per
+(representation, content coding) pair and reports, for growing task counts:
+
+- wire KiB: response body as sent (compressed size when compressed)
+- decode ms: median time to decompress and turn the body into the list of
+  task dicts the app uses (todo_client.decode_body), taken over the raw
+  bytes so network time is left out
+
+"json / identity" is the path the app used before negotiation.
+
+    python todo_wire_benchmark.py
+    python todo_wire_benchmark.py --sizes 1000 50000 --repeat 20
+"""
+
+import argparse
+import gzip
+import statistics
+import time
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import todo_client
+from todo_standin_server import StandInServer, brotli
+
+DEFAULT_SIZES = [100, 1000, 10000]
+
+VARIANTS = [
+    ("json", todo_client.JSON_TYPE, "identity"),
+    ("json", todo_client.JSON_TYPE, "gzip"),
+    ("json", todo_client.JSON_TYPE, "br"),
+    ("columnar", todo_client.COLUMNAR_TYPE, "identity"),
+    ("columnar", todo_client.COLUMNAR_TYPE, "gzip"),
+    ("columnar", todo_client.COLUMNAR_TYPE, "br"),
+    ("msgpack", todo_client.MSGPACK_TYPE, "identity"),
+    ("msgpack", todo_client.MSGPACK_TYPE, "br"),
+]
+
+_DECOMPRESS = {
+    "identity": lambda data: data,
+    "gzip": gzip.decompress,
+    "deflate": zlib.decompress,
+}
+if brotli is not None:
+    _DECOMPRESS["br"] = brotli.decompress
+
+
+def _fetch_raw(session, url, content_type, encoding):
+    """GETs `url`; returns (raw body bytes, response headers)."""
+    response = session.get(
+        url,
+        headers={"Accept": content_type, "Accept-Encoding": encoding},
+        stream=True,
+        timeout=todo_client.DEFAULT_TIMEOUT,
+    )
+    response.raise_for_status()
+    raw = response.raw.read(decode_content=False)
+    response.close()
+    return raw, response.headers
+
+
+def _decode(raw, headers):
+    """What requests + todo_client.decode_body do with a received body."""
+    response = requests.Response()
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = _DECOMPRESS[headers.get("Content-Encoding", "identity")](raw)
+    response.encoding = "utf-8"
+    return todo_client.decode_body(response)["tasks"]
+
+
+def benchmark_size(task_count, repeat=10):
+    """Returns one result dict per variant the environment supports."""
+    results = []
+    session = todo_client.create_session()
+    with StandInServer(task_count=task_count) as server:
+        for name, content_type, encoding in VARIANTS:
+            if encoding not in _DECOMPRESS:
+                continue  # brotli not installed
+            raw, headers = _fetch_raw(session, server.url, content_type, encoding)
+            if headers.get("Content-Type") != content_type:
+                continue  # Server can't produce it (msgpack not installed)
+            if headers.get("Content-Encoding", "identity") != encoding:
+                continue
+            tasks = _decode(raw, headers)
+            assert len(tasks) == task_count
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                _decode(raw, headers)
+                timings.append(time.perf_counter() - started)
+            results.append(
+                {
+                    "tasks": task_count,
+                    "format": name,
+                    "encoding": encoding,
+                    "wire_kib": len(raw) / 1024,
+                    "decode_ms": statistics.median(timings) * 1000,
+                }
+            )
+    baseline = results[0]  # json / identity
+    for result in results:
+        result["wire_pct"] = 100 * result["wire_kib"] / baseline["wire_kib"]
+        result["decode_pct"] = 100 * result["decode_ms"] / baseline["decode_ms"]
+    return results
+
+
+def format_table(results):
+    columns = [
+        ("tasks", "tasks", "{}"),
+        ("format", "format", "{}"),
+        ("encoding", "encoding", "{}"),
+        ("wire_kib", "wire KiB", "{:.1f}"),
+        ("wire_pct", "wire %", "{:.0f}"),
+        ("decode_ms", "decode ms", "{:.2f}"),
+        ("decode_pct", "decode %", "{:.0f}"),
+    ]
+    rows = [[title for _, title, _ in columns]]
+    for result in results:
+        rows.append([fmt.format(result[key]) for key, _, fmt in columns])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return "\n".join(
+        "  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare task list wire formats.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=10, help="Decodes per variant")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.extend(benchmark_size(size, repeat=args.repeat))
+    print(format_table(results))
+
+
+if __name__ == "__main__":
+    main()
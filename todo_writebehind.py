@@ -0,0 +1,269 @@
+"""Write-behind queue for task updates and deletes.
+
+In write-behind mode the UI applies a change to its TaskStore and returns at
+once; the backend call is queued here and sent by a background thread, so a
+checkbox click no longer waits for a PUT.
+
+- Changes to a task that is still queued are merged into one payload (ticking
+  a task and editing its title sends a single PUT; ticking and unticking it
+  again sends nothing). A delete replaces any queued update of the task.
+- A write goes out `flush_delay` seconds after the first change to its task
+  (later changes merged into it don't postpone it), together with the other
+  ready writes through todo_bulk (batch endpoint or concurrent single calls).
+- Transient failures (timeouts, 429, 5xx) are retried with exponential
+  backoff; other failures, or too many attempts, park the write as failed
+  until the UI retries or discards it.
+
+Kept free of Streamlit calls: the worker thread must not touch the script's
+session state. The UI collects results with `drain_confirmed()` instead.
+"""
+
+import contextvars
+import random
+import threading
+import time
+
+import todo_bulk
+
+# Seconds a queued write waits for more changes to the same task, counted from
+# the first one.
+FLUSH_DELAY = 0.3
+
+# Attempts per write before it is reported as failed.
+MAX_ATTEMPTS = 5
+
+# Retry delay: BACKOFF_BASE * 2 ** (attempt - 1), capped, with jitter.
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+
+class PendingWrite:
+    """One queued change: an update (merged `changes`) or a delete."""
+
+    __slots__ = (
+        "task_id",
+        "op",
+        "changes",
+        "snapshot",
+        "attempts",
+        "error",
+        "ready_at",
+    )
+
+    def __init__(self, task_id, op, changes=None, snapshot=None, delay=0.0):
+        self.task_id = task_id
+        self.op = op  # "update" or "delete"
+        self.changes = dict(changes or {})
+        # TaskStore rollback snapshot from before the first queued change
+        self.snapshot = snapshot
+        self.attempts = 0
+        self.error = None  # Message of the last failed attempt
+        self.ready_at = time.monotonic() + delay
+
+    def operation(self):
+        if self.op == "delete":
+            return todo_bulk.delete_op(self.task_id)
+        return todo_bulk.update_op(self.task_id, dict(self.changes))
+
+    def merge(self, later):
+        """Folds a later write for the same task into this one."""
+        if later.op == "delete":
+            self.op = "delete"
+            self.changes = {}
+        elif self.op == "update":
+            self.changes.update(later.changes)
+
+    def is_noop(self):
+        """True if the merged changes only restore the values from before."""
+        return (
+            self.op == "update"
+            and isinstance(self.snapshot, dict)
+            and all(self.snapshot.get(k) == v for k, v in self.changes.items())
+        )
+
+
+class WriteBehindQueue:
+    """Per-session queue of task writes, flushed by a background thread.
+
+    The worker thread is started on demand and exits once the queue is
+    empty. It runs in a copy of the context of the call that started it, so
+    active instrumentation sees its requests.
+    """
+
+    def __init__(
+        self,
+        session,
+        endpoint,
+        cache=None,
+        use_batch=False,
+        flush_delay=FLUSH_DELAY,
+        max_attempts=MAX_ATTEMPTS,
+        max_batch=todo_bulk.BATCH_CHUNK_SIZE,
+    ):
+        self.session = session
+        self.endpoint = endpoint
+        self.cache = cache  # Invalidated after writes (must be thread-safe)
+        self.use_batch = use_batch
+        self.flush_delay = flush_delay
+        self.max_attempts = max_attempts
+        self.max_batch = max_batch
+        self._cond = threading.Condition()
+        self._queued = {}  # taskId -> PendingWrite, in flush order
+        self._in_flight = {}  # taskId -> PendingWrite being sent
+        self._failed = {}  # taskId -> PendingWrite that gave up
+        self._confirmed = []  # (PendingWrite, task) not yet drained by the UI
+        self._worker = None
+
+    # --- Enqueueing (script thread) ---
+    def update(self, task_id, changes, snapshot=None):
+        self._add(PendingWrite(task_id, "update", changes, snapshot, self.flush_delay))
+
+    def delete(self, task_id, snapshot=None):
+        self._add(PendingWrite(task_id, "delete", None, snapshot, self.flush_delay))
+
+    def _add(self, write):
+        with self._cond:
+            queued = self._queued.get(write.task_id)
+            if queued is not None:
+                queued.merge(write)  # Keeps its ready_at
+                write = queued
+            else:
+                self._queued[write.task_id] = write
+            # Only safe to drop when nothing else for the task is on its way
+            if write.is_noop() and write.task_id not in self._in_flight:
+                del self._queued[write.task_id]
+            self._start_worker()
+            self._cond.notify()
+
+    # --- Views (script thread) ---
+    def pending(self):
+        """Writes not yet confirmed: in flight first, then queued."""
+        with self._cond:
+            return list(self._in_flight.values()) + list(self._queued.values())
+
+    def failed(self):
+        with self._cond:
+            return list(self._failed.values())
+
+    def has_pending(self):
+        with self._cond:
+            return bool(self._queued or self._in_flight)
+
+    def drain_confirmed(self):
+        """(PendingWrite, task) pairs sent since the last call.
+
+        `task` is the backend's copy for updates, None for deletes.
+        """
+        with self._cond:
+            confirmed, self._confirmed = self._confirmed, []
+        return confirmed
+
+    def retry(self, task_id=None):
+        """Queues failed writes (one, or all) again with fresh attempts."""
+        with self._cond:
+            ids = [task_id] if task_id is not None else list(self._failed)
+            for tid in ids:
+                write = self._failed.pop(tid, None)
+                if write is None:
+                    continue
+                write.attempts = 0
+                write.ready_at = time.monotonic()
+                self._requeue(write)
+            self._start_worker()
+            self._cond.notify()
+
+    def discard(self, task_id):
+        """Forgets a failed write and returns it (for rolling the UI back)."""
+        with self._cond:
+            return self._failed.pop(task_id, None)
+
+    def wait_idle(self, timeout=None):
+        """Blocks until nothing is queued or in flight; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queued or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # --- Worker ---
+    def _start_worker(self):
+        # Called with the lock held
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(self._work,),
+                name="todo-write-behind",
+                daemon=True,
+            )
+            self._worker.start()
+
+    def _requeue(self, write):
+        # Called with the lock held. A newer write for the same task may have
+        # been queued meanwhile; this one's changes come first.
+        newer = self._queued.pop(write.task_id, None)
+        if newer is not None:
+            write.merge(newer)
+            write.ready_at = min(write.ready_at, newer.ready_at)
+        self._queued[write.task_id] = write
+
+    def _take_ready(self):
+        # Called with the lock held
+        now = time.monotonic()
+        batch = []
+        for task_id, write in self._queued.items():
+            if write.ready_at <= now and task_id not in self._in_flight:
+                batch.append(write)
+                if len(batch) >= self.max_batch:
+                    break
+        for write in batch:
+            del self._queued[write.task_id]
+            self._in_flight[write.task_id] = write
+        return batch
+
+    def _work(self):
+        while True:
+            with self._cond:
+                batch = self._take_ready()
+                while not batch:
+                    if not self._queued:
+                        self._worker = None
+                        self._cond.notify_all()  # Wake wait_idle()
+                        return
+                    next_ready = min(w.ready_at for w in self._queued.values())
+                    self._cond.wait(max(0.0, next_ready - time.monotonic()))
+                    batch = self._take_ready()
+            self._send(batch)
+
+    def _send(self, batch):
+        operations = [write.operation() for write in batch]
+        writes = {id(op): write for op, write in zip(operations, batch)}
+        try:
+            result = todo_bulk.run_bulk(
+                self.session, self.endpoint, operations, use_batch=self.use_batch
+            )
+        except Exception as e:  # Should not happen; run_bulk reports per op
+            result = todo_bulk.BulkResult()
+            result.failed = [(op, str(e)) for op in operations]
+            result.retryable = list(operations)
+        retryable = {id(op) for op in result.retryable}
+
+        with self._cond:
+            for op, task in result.succeeded:
+                write = self._in_flight.pop(writes[id(op)].task_id)
+                self._confirmed.append((write, task))
+            for op, message in result.failed:
+                write = self._in_flight.pop(writes[id(op)].task_id)
+                write.attempts += 1
+                write.error = message
+                if id(op) in retryable and write.attempts < self.max_attempts:
+                    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (write.attempts - 1))
+                    write.ready_at = time.monotonic() + delay * random.uniform(0.5, 1)
+                    self._requeue(write)
+                else:
+                    self._failed[write.task_id] = write
+            self._cond.notify_all()
+        if result.succeeded and self.cache is not None:
+            self.cache.invalidate(self.endpoint)